@@ -0,0 +1,141 @@
+"""
+Módulo para la captura de video en un hilo independiente.
+
+Proporciona la clase FrameGrabber, que lee la cámara en segundo plano
+y conserva solo el fotograma más reciente, de forma que el procesamiento
+no se bloquea esperando la E/S de la cámara.
+"""
+
+import threading
+import cv2
+import numpy as np
+from typing import Tuple, Optional
+
+
+class FrameGrabber:
+    """
+    Hilo productor que captura fotogramas de la cámara.
+    
+    La cámara se vacía continuamente con grab(), pero solo se decodifica
+    (retrieve()) el fotograma que sigue a la llegada de un lector, así el
+    consumidor siempre recibe el fotograma más reciente y no se convierte
+    a BGR ninguno que se vaya a descartar.
+    """
+    
+    def __init__(self, cap: cv2.VideoCapture, mirror: bool = False,
+                 size: Optional[Tuple[int, int]] = None):
+        """
+        Inicializa el capturador.
+        
+        Args:
+            cap: Cámara ya abierta y configurada
+            mirror: Voltear horizontalmente cada fotograma al capturarlo
+            size: Tamaño (ancho, alto) al que se escalan los fotogramas si
+                la cámara entrega otro (None: tal cual)
+        """
+        self.cap = cap
+        self.mirror = mirror
+        self.size = size
+        self._lock = threading.Lock()
+        self._new_frame = threading.Condition(self._lock)
+        self._thread = None
+        self._running = False
+        
+        # Último fotograma y número de secuencia
+        self.latest_frame = None
+        self._seq = 0
+        self._last_read_seq = 0
+        
+        # Capturas hechas con grab(), captura de la que salió latest_frame
+        # y lectores esperando un fotograma
+        self._grab_seq = 0
+        self._frame_grab_seq = 0
+        self._waiting = 0
+    
+    def start(self) -> "FrameGrabber":
+        """Arranca el hilo de captura."""
+        self._running = True
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+    
+    def _run(self):
+        """Bucle del hilo: captura y publica el último fotograma."""
+        while self._running:
+            # grab() solo avanza la cámara; el fotograma se decodifica con
+            # retrieve() únicamente si hay un lector esperando, y siempre el
+            # de la última captura
+            ret = self.cap.grab()
+            if ret:
+                with self._lock:
+                    self._grab_seq += 1
+                    grab_seq = self._grab_seq
+                    wanted = self._waiting > 0
+                if not wanted:
+                    continue
+                ret, frame = self.cap.retrieve()
+            
+            # Muchas cámaras ignoran la resolución pedida: escalar al tamaño
+            # del juego para que el render reciba siempre el mismo
+            if ret and self.size is not None and frame.shape[1::-1] != self.size:
+                frame = cv2.resize(frame, self.size)
+            
+            # Espejo en el mismo buffer (cada lectura entrega un array nuevo)
+            if ret and self.mirror:
+                cv2.flip(frame, 1, dst=frame)
+            
+            with self._new_frame:
+                if not ret:
+                    self._running = False
+                else:
+                    self.latest_frame = frame
+                    self._frame_grab_seq = grab_seq
+                    self._seq += 1
+                self._new_frame.notify_all()
+    
+    def read(self, timeout: float = 1.0) -> Tuple[bool, Optional[np.ndarray]]:
+        """
+        Devuelve el fotograma más reciente que aún no se ha leído.
+        
+        Si el último ya fue entregado, o la cámara capturó otro después,
+        espera a que se decodifique el siguiente.
+        
+        Args:
+            timeout: Tiempo máximo de espera en segundos
+        
+        Returns:
+            Tupla (ret, frame) como cv2.VideoCapture.read: (False, None)
+            solo si la captura terminó (fin de la cámara o stop())
+        
+        Raises:
+            TimeoutError: Si no llega ningún fotograma en timeout segundos
+                y la captura sigue en marcha (p. ej. cámara lenta al
+                arrancar)
+        """
+        def fresh():
+            return (self._seq != self._last_read_seq and
+                    self._frame_grab_seq == self._grab_seq)
+        
+        with self._new_frame:
+            self._waiting += 1
+            try:
+                self._new_frame.wait_for(lambda: fresh() or not self._running, timeout)
+            finally:
+                self._waiting -= 1
+            if not fresh():
+                if self._running:
+                    raise TimeoutError("No llegó ningún fotograma a tiempo")
+                return False, None
+            
+            self._last_read_seq = self._seq
+            return True, self.latest_frame
+    
+    def stop(self):
+        """Detiene el hilo de captura y espera a que termine."""
+        with self._new_frame:
+            self._running = False
+            # Despertar a los lectores en espera: read() devuelve (False, None)
+            self._new_frame.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
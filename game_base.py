@@ -0,0 +1,789 @@
+"""
+Módulo con la base común de los juegos controlados por gestos.
+
+Proporciona la clase BaseGestureGame, que reúne el bucle principal
+(captura, detección, física y render) compartido por la versión con
+MediaPipe (main.py) y la versión solo OpenCV (main_opencv.py). Cada
+versión aporta su rastreador de manos y su estilo de dibujo.
+"""
+
+import cv2
+import math
+from abc import ABC, abstractmethod
+from collections import deque
+import numpy as np
+import queue
+import threading
+import time
+from functools import lru_cache
+from typing import Tuple, Optional, Protocol
+from physics_world import PhysicsWorld
+from frame_grabber import FrameGrabber
+from utils import njit, get_coordinate_mapper
+
+
+# Códigos de las teclas de control (se calculan una vez, no por fotograma)
+KEY_QUIT = ord('q')
+KEY_LANDMARKS = ord('l')
+KEY_PAUSE = ord('p')
+KEY_RESET = ord('r')
+
+
+@lru_cache(maxsize=256)
+def _glyph_sprite(char: str, scale: float, color: Tuple[int, int, int],
+                  thickness: int) -> Tuple[np.ndarray, np.ndarray, int, int, int]:
+    """
+    Rasteriza un carácter en un sprite con máscara (atlas de glifos).
+    
+    Args:
+        char: Carácter a dibujar
+        scale: Escala de la fuente
+        color: Color BGR
+        thickness: Grosor del trazo
+        
+    Returns:
+        Tupla (sprite, máscara, dx, dy, avance), donde (dx, dy) es la
+        posición de la esquina superior izquierda del sprite respecto al
+        origen de cv2.putText y avance es lo que se desplaza el origen
+        hasta el siguiente carácter
+    """
+    font = cv2.FONT_HERSHEY_SIMPLEX
+    (w, h), baseline = cv2.getTextSize(char, font, scale, thickness)
+    pad = h // 4 + thickness + 1  # algunos glifos sobresalen de getTextSize
+    sprite = np.zeros((h + baseline + 2 * pad, w + 2 * pad, 3), dtype=np.uint8)
+    cv2.putText(sprite, char, (pad, pad + h), font, scale, color, thickness)
+    
+    # getTextSize incluye el margen final del glifo: se mide el avance
+    # real como en BaseGestureGame._text_advance
+    advance = (cv2.getTextSize(char + "0", font, scale, thickness)[0][0]
+               - cv2.getTextSize("0", font, scale, thickness)[0][0])
+    return sprite, sprite.any(axis=2)[..., None], -pad, -(pad + h), advance
+
+
+@njit(cache=True)
+def _rotate_rect(cos_a, sin_a, x, y, hw, hh, out):
+    """
+    Escribe las esquinas de un rectángulo rotado y trasladado.
+    
+    Las esquinas van en el orden (-hw, -hh), (hw, -hh), (hw, hh),
+    (-hw, hh) y se redondean al entero más cercano (como np.rint).
+    
+    Args:
+        cos_a: Coseno del ángulo
+        sin_a: Seno del ángulo
+        x: Posición x del centro
+        y: Posición y del centro
+        hw: Mitad del ancho
+        hh: Mitad del alto
+        out: Array (4, 2) int32 de salida
+    """
+    out[0, 0] = round(x - hw * cos_a + hh * sin_a)
+    out[0, 1] = round(y - hw * sin_a - hh * cos_a)
+    out[1, 0] = round(x + hw * cos_a + hh * sin_a)
+    out[1, 1] = round(y + hw * sin_a - hh * cos_a)
+    out[2, 0] = round(x + hw * cos_a - hh * sin_a)
+    out[2, 1] = round(y + hw * sin_a + hh * cos_a)
+    out[3, 0] = round(x - hw * cos_a - hh * sin_a)
+    out[3, 1] = round(y - hw * sin_a + hh * cos_a)
+
+
+@njit(cache=True)
+def _smooth_pose(sx, sy, sa, px, py, angle, scale_x, scale_y, width, height,
+                 smoothing, angle_smoothing, margin):
+    """
+    Convierte, suaviza y limita la pose de la plataforma en una llamada.
+    
+    Equivale a CoordinateMapper.map_point (con sus escalas scale_x y
+    scale_y), smooth_value sobre x, y y el ángulo, y clamp de la posición
+    a [margin, tamaño - margin].
+    
+    Args:
+        sx: Posición x suavizada actual
+        sy: Posición y suavizada actual
+        sa: Ángulo suavizado actual
+        px: Posición x de la mano en píxeles (origen arriba-izquierda)
+        py: Posición y de la mano en píxeles (origen arriba-izquierda)
+        angle: Ángulo de la mano en radianes
+        scale_x: Escala horizontal fotograma -> mundo (CoordinateMapper.sx)
+        scale_y: Escala vertical fotograma -> mundo (CoordinateMapper.sy)
+        width: Ancho del mundo
+        height: Alto del mundo
+        smoothing: Factor de suavizado de la posición
+        angle_smoothing: Factor de suavizado del ángulo
+        margin: Distancia mínima de la plataforma a los bordes
+    
+    Returns:
+        Tupla (x, y, ángulo) suavizada
+    """
+    # CoordinateMapper.map_point: escalar e invertir el eje Y
+    target_x = px * scale_x
+    target_y = height - py * scale_y
+    
+    sx += (target_x - sx) * smoothing
+    sy += (target_y - sy) * smoothing
+    sa += (angle - sa) * angle_smoothing
+    
+    if sx < margin:
+        sx = margin
+    elif sx > width - margin:
+        sx = width - margin
+    if sy < margin:
+        sy = margin
+    elif sy > height - margin:
+        sy = height - margin
+    return sx, sy, sa
+
+
+class HandTrackerProtocol(Protocol):
+    """Interfaz que deben cumplir los rastreadores de manos del juego."""
+    
+    def detect_hand(self, frame: np.ndarray) -> Tuple[Optional[np.ndarray], Optional[float], Optional[Tuple[float, float]]]:
+        ...
+    
+    def draw_landmarks(self, frame: np.ndarray, landmarks: np.ndarray, copy: bool = True) -> np.ndarray:
+        ...
+    
+    def release(self):
+        ...
+
+
+class BaseGestureGame(ABC):
+    """
+    Clase base del juego de la plataforma de equilibrio.
+    
+    Gestiona:
+    - Captura de video (con espejo) y detección de manos en hilos aparte
+    - Física a paso fijo en su propio hilo
+    - Render, HUD y entrada de teclado en el hilo principal
+    
+    Las subclases definen el estilo visual (métodos abstractos
+    _draw_platform, _draw_ball, _draw_walls, _draw_bucket y
+    _print_controls; posición del HUD y aviso de pausa) y pueden
+    ampliar la entrada y la visualización con _handle_key y _show.
+    """
+    
+    # Parámetros de cada versión (las subclases los sobrescriben)
+    window_name = "Plataforma de Equilibrio - Control por Gestos"
+    position_smoothing = 0.15
+    angle_smoothing = 0.1
+    platform_margin = 50
+    platform_width = 100
+    platform_height = 15
+    hud_origin = (10, 30)  # origen del texto "FPS: "; el contador va 30 px debajo
+    hud_text_style = (0.7, (0, 255, 0), 2)  # escala, color y grosor del HUD
+    hud_refresh_ns = 100_000_000  # el número de FPS se refresca a 10 Hz
+    read_error_message = "Error: No se pudo leer el fotograma."
+    interrupt_message = "\nJuego interrumpido por el usuario."
+    
+    def __init__(self, hand_tracker: HandTrackerProtocol, width: int = 800, height: int = 600):
+        """
+        Inicializa el juego.
+        
+        Args:
+            hand_tracker: Rastreador de manos (MediaPipe u OpenCV)
+            width: Ancho de la ventana
+            height: Alto de la ventana
+        """
+        self.width = width
+        self.height = height
+        self.running = True
+        
+        # Inicializar componentes
+        self.hand_tracker = hand_tracker
+        self.physics_world = PhysicsWorld(width, height)
+        
+        # La física avanza a paso fijo en su propio hilo
+        self.physics_dt = 1 / 120
+        self._physics_lock = threading.Lock()
+        # Órdenes del teclado que ejecuta el hilo de física (deque es
+        # seguro entre hilos para append/popleft)
+        self._physics_commands = deque()
+        
+        # Variables de suavizado
+        self.smoothed_x = width / 2
+        self.smoothed_y = height / 2
+        self.smoothed_angle = 0.0
+        
+        # Semiejes de la plataforma y buffer de sus esquinas
+        self._platform_half = (self.platform_width / 2, self.platform_height / 2)
+        self._corners_i32 = np.empty((4, 2), dtype=np.int32)
+        
+        # Sprites de las bolas por radio (se crean al dibujar la primera)
+        self._ball_sprites = {}
+        
+        # Capa estática (zona de captura y paredes), se dibuja una sola vez
+        self._build_static_layer()
+        self._build_hud()
+        
+        # FPS y timing
+        self._prev_ns = time.perf_counter_ns()
+        self.fps = 0.0
+        self.fps_text = "0"
+        self._fps_text_ns = self._prev_ns
+        
+        # Estado del juego
+        self.paused = False
+        self.show_landmarks = True
+    
+    def run(self):
+        """Ejecuta el bucle principal del juego."""
+        # Abrir cámara
+        cap = cv2.VideoCapture(0)
+        
+        if not cap.isOpened():
+            print("Error: No se pudo acceder a la cámara.")
+            return
+        
+        self._configure_camera(cap)
+        self._print_controls()
+        self._create_window()
+        
+        # Hilo lector: captura + espejo (siempre el fotograma más reciente),
+        # escalado a width x height, el tamaño de la capa estática y del HUD
+        grabber = FrameGrabber(cap, mirror=True, size=(self.width, self.height)).start()
+        
+        # Hilo de detección; hilo principal: render + visualización
+        results = queue.Queue(maxsize=2)
+        detector = threading.Thread(
+            target=self._capture_detect_loop, args=(grabber, results), daemon=True
+        )
+        detector.start()
+        
+        # Hilo de física a paso fijo, independiente de los FPS de la cámara
+        physics = threading.Thread(target=self._physics_loop, daemon=True)
+        physics.start()
+        
+        try:
+            self._physics_render_loop(results)
+        
+        except KeyboardInterrupt:
+            print(self.interrupt_message)
+        
+        finally:
+            # Liberar recursos
+            self.running = False
+            grabber.stop()
+            detector.join(timeout=2.0)
+            physics.join(timeout=1.0)
+            cap.release()
+            self.hand_tracker.release()
+            cv2.destroyAllWindows()
+            print("Juego finalizado.")
+    
+    def _configure_camera(self, cap: cv2.VideoCapture):
+        """Configura la resolución, el formato y la cola de fotogramas de la cámara."""
+        cap.set(cv2.CAP_PROP_FRAME_WIDTH, self.width)
+        cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self.height)
+        # Un solo fotograma en la cola del driver (V4L2 guarda 4 por defecto)
+        cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+        # MJPG: menos ancho de banda USB que YUYV (30 FPS a más resolución)
+        cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*'MJPG'))
+    
+    def _create_window(self):
+        """
+        Crea la ventana del juego, con OpenGL si OpenCV lo soporta.
+        
+        Con WINDOW_OPENGL, cv2.imshow sube el fotograma como textura y la
+        presentación la hace la GPU; WINDOW_AUTOSIZE mantiene la ventana
+        de tamaño fijo, como sin OpenGL. Si OpenCV se compiló sin soporte
+        OpenGL se usa una ventana normal.
+        """
+        try:
+            cv2.namedWindow(self.window_name, cv2.WINDOW_OPENGL | cv2.WINDOW_AUTOSIZE)
+        except cv2.error:
+            cv2.namedWindow(self.window_name, cv2.WINDOW_AUTOSIZE)
+    
+    @abstractmethod
+    def _print_controls(self):
+        """Muestra los controles por consola."""
+    
+    def _capture_detect_loop(self, grabber: FrameGrabber, results: queue.Queue):
+        """
+        Hilo de detección.
+        
+        Publica tuplas (frame, landmarks, angle, position) en la cola. Si
+        la cola está llena descarta la más antigua para no acumular
+        latencia. Solo cuando la captura termina de verdad publica None;
+        si la cámara tarda (p. ej. al arrancar) sigue esperando.
+        
+        Args:
+            grabber: Capturador de fotogramas ya arrancado
+            results: Cola acotada hacia el hilo de física y render
+        """
+        while self.running:
+            try:
+                ret, frame = grabber.read()
+            except TimeoutError:
+                continue
+            
+            if not ret:
+                item = None
+            else:
+                # Detectar mano (el fotograma ya llega en espejo)
+                landmarks, angle, position = self.hand_tracker.detect_hand(frame)
+                item = (frame, landmarks, angle, position)
+            
+            try:
+                results.put_nowait(item)
+            except queue.Full:
+                # Descartar el resultado más antiguo (único productor)
+                try:
+                    results.get_nowait()
+                except queue.Empty:
+                    pass
+                results.put_nowait(item)
+            
+            if item is None:
+                break
+    
+    def _physics_render_loop(self, results: queue.Queue):
+        """
+        Bucle de render y entrada (en el hilo principal).
+        
+        cv2.imshow y cv2.pollKey se llaman solo desde aquí, ya que
+        HighGUI no es seguro entre hilos.
+        
+        Args:
+            results: Cola con los resultados del hilo de detección
+        """
+        smoothing = self.position_smoothing
+        angle_smoothing = self.angle_smoothing
+        margin = float(self.platform_margin)
+        width, height = float(self.width), float(self.height)
+        # FrameGrabber entrega fotogramas del tamaño del mundo
+        mapper = get_coordinate_mapper(self.width, self.height, self.width, self.height)
+        scale_x, scale_y = mapper.sx, mapper.sy
+        
+        while self.running:
+            try:
+                item = results.get(timeout=1.0)
+            except queue.Empty:
+                continue
+            
+            if item is None:
+                print(self.read_error_message)
+                break
+            
+            frame, landmarks, angle, position = item
+            
+            # Actualizar plataforma si se detectó una mano
+            if landmarks is not None and position is not None and angle is not None:
+                # Convertir, suavizar y limitar (una sola llamada compilada)
+                self.smoothed_x, self.smoothed_y, self.smoothed_angle = _smooth_pose(
+                    self.smoothed_x, self.smoothed_y, self.smoothed_angle,
+                    float(position[0]), float(position[1]), float(angle),
+                    scale_x, scale_y, width, height, smoothing, angle_smoothing, margin
+                )
+                
+                # Actualizar plataforma
+                if not self.paused:
+                    with self._physics_lock:
+                        self.physics_world.update_platform(
+                            (self.smoothed_x, self.smoothed_y),
+                            self.smoothed_angle
+                        )
+                
+                # Dibujar landmarks si está habilitado
+                if self.show_landmarks:
+                    frame = self.hand_tracker.draw_landmarks(frame, landmarks, copy=False)
+            
+            # Renderizar escena
+            frame = self._render_scene(frame)
+            
+            # Calcular FPS (media móvil exponencial de 1/dt, cada fotograma)
+            now = time.perf_counter_ns()
+            dt = (now - self._prev_ns) * 1e-9
+            self._prev_ns = now
+            if dt > 0:
+                self.fps = 0.9 * self.fps + 0.1 / dt
+            
+            # Texto de FPS para el HUD, a ritmo legible (hud_refresh_ns)
+            if now - self._fps_text_ns >= self.hud_refresh_ns:
+                self._fps_text_ns = now
+                self.fps_text = f"{self.fps:.0f}"
+            
+            # Dibujar UI
+            self._draw_ui(frame)
+            
+            # Mostrar
+            self._show(frame)
+            
+            # Procesar entrada (pollKey no bloquea; el ritmo lo marca la cola)
+            key = cv2.pollKey() & 0xFF
+            if key == KEY_QUIT:
+                self.running = False
+            elif key == KEY_LANDMARKS:
+                self.show_landmarks = not self.show_landmarks
+            elif key == KEY_PAUSE:
+                self.paused = not self.paused
+            elif key == KEY_RESET:
+                self._physics_commands.append(self.physics_world.reset)
+            else:
+                self._handle_key(key)
+    
+    def _show(self, frame: np.ndarray):
+        """Muestra el fotograma final en la ventana del juego."""
+        cv2.imshow(self.window_name, frame)
+    
+    def _handle_key(self, key: int):
+        """Procesa teclas adicionales de cada versión (por defecto ninguna)."""
+        pass
+    
+    def _physics_loop(self):
+        """
+        Hilo de física: avanza la simulación a paso fijo (physics_dt).
+        
+        El paso no depende de los FPS de la cámara ni del render. Si el
+        hilo se retrasa más de un paso, se resincroniza en lugar de
+        encadenar pasos para recuperar el tiempo perdido. Antes de cada
+        paso ejecuta las órdenes encoladas por el teclado (p. ej. reset),
+        así el hilo principal no espera al cerrojo de la física.
+        """
+        commands = self._physics_commands
+        next_step = time.perf_counter()
+        while self.running:
+            if commands:
+                with self._physics_lock:
+                    while commands:
+                        commands.popleft()()
+            
+            if not self.paused:
+                with self._physics_lock:
+                    self.physics_world.update(self.physics_dt)
+            
+            next_step += self.physics_dt
+            delay = next_step - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                next_step = time.perf_counter()
+    
+    def _render_scene(self, frame: np.ndarray) -> np.ndarray:
+        """
+        Renderiza los objetos del mundo de física en el fotograma.
+        
+        Args:
+            frame: Fotograma de OpenCV
+        
+        Returns:
+            Fotograma con los objetos renderizados
+        """
+        # Copiar el estado de la física (lo actualiza su propio hilo)
+        with self._physics_lock:
+            platform_x, platform_y = self.physics_world.get_platform_position()
+            platform_angle = self.physics_world.get_platform_angle()
+            ball_xy, ball_radii = self.physics_world.get_balls()
+            ball_xy = ball_xy.astype(np.int32).tolist()
+            ball_radii = ball_radii.tolist()
+        
+        # Dibujar zona de captura (fondo propio de cada versión + capa estática)
+        self._draw_bucket_fill(frame)
+        self._blit_static(frame, self._bucket_rois)
+        
+        # Dibujar plataforma
+        self._draw_platform(frame, platform_x, platform_y, platform_angle)
+        
+        # Dibujar bolas (sprite prerrenderizado por radio)
+        ball_sprite = self._ball_sprite
+        blit_sprite = self._blit_sprite
+        for (x, y), radius in zip(ball_xy, ball_radii):
+            sprite, mask, ox, oy = ball_sprite(radius)
+            blit_sprite(frame, sprite, mask, x - ox, y - oy)
+        
+        # Dibujar paredes (la capa estática sigue el tamaño del fotograma)
+        if frame.shape[:2] != self._static_layer.shape[:2]:
+            self._build_static_layer(frame.shape[:2])
+        for roi in self._wall_solid_rois:
+            frame[roi] = self._static_layer[roi]
+        self._blit_static(frame, self._wall_rois)
+        
+        return frame
+    
+    def _build_static_layer(self, shape: Optional[Tuple[int, int]] = None):
+        """
+        Rasteriza una vez los elementos fijos de la escena.
+        
+        La zona de captura y las paredes no cambian entre fotogramas: se
+        dibujan en una capa con su máscara y en cada fotograma solo se
+        copian las regiones que ocupan.
+        
+        Args:
+            shape: Tamaño (alto, ancho) de los fotogramas (None: el del juego)
+        """
+        h, w = shape if shape is not None else (self.height, self.width)
+        layer = np.zeros((h, w, 3), dtype=np.uint8)
+        
+        # Zona de captura: región = rectángulo que engloba lo dibujado
+        self._draw_bucket(layer)
+        x, y, bw, bh = cv2.boundingRect(layer.any(axis=2).astype(np.uint8))
+        self._bucket_rois = [(slice(y, y + bh), slice(x, x + bw))]
+        
+        # Paredes: franjas a lo largo de los bordes del fotograma
+        self._draw_walls(layer)
+        self._static_layer = layer
+        self._static_mask = layer.any(axis=2)[..., None]
+        
+        # Las líneas/columnas pegadas al borde que la pared cubre por
+        # completo se copian tal cual; el resto de la franja (extremos
+        # redondeados, antialias) se copia con máscara
+        mask = self._static_mask[..., 0]
+        t = 4
+        left = self._covered_lines(mask[:, :t].T)
+        right = self._covered_lines(mask[:, :-t - 1:-1].T)
+        top = self._covered_lines(mask[:t])
+        self._wall_solid_rois = [
+            (slice(0, h), slice(0, left)),
+            (slice(0, h), slice(w - right, w)),
+            (slice(0, top), slice(0, w))
+        ]
+        self._wall_rois = [
+            roi for roi in (
+                (slice(0, h), slice(left, t)),
+                (slice(0, h), slice(w - t, w - right)),
+                (slice(top, t), slice(0, w))
+            ) if mask[roi].any()
+        ]
+    
+    def _covered_lines(self, strip: np.ndarray) -> int:
+        """Cuenta las filas iniciales de la franja cubiertas por completo."""
+        count = 0
+        for line in strip:
+            if not line.all():
+                break
+            count += 1
+        return count
+    
+    def _blit_static(self, frame: np.ndarray, rois: list):
+        """Copia en el fotograma los píxeles de la capa estática de las regiones dadas."""
+        for roi in rois:
+            np.copyto(frame[roi], self._static_layer[roi], where=self._static_mask[roi])
+    
+    def _make_tint(self, pt1: Tuple[int, int], pt2: Tuple[int, int],
+                   color: Tuple[int, int, int], alpha: float) -> tuple:
+        """
+        Prepara un rectángulo semitransparente fijo (panel, zona de captura).
+        
+        El parche de color se crea una vez; en cada fotograma _blit_tint
+        lo mezcla solo con la región que cubre, con el mismo resultado que
+        dibujar el rectángulo en una copia del fotograma y usar
+        cv2.addWeighted sobre todo el fotograma.
+        
+        Args:
+            pt1: Esquina superior izquierda (como en cv2.rectangle)
+            pt2: Esquina inferior derecha, incluida
+            color: Color BGR del rectángulo
+            alpha: Opacidad del rectángulo (0-1)
+        
+        Returns:
+            Tupla (región, parche, alpha) para _blit_tint
+        """
+        x0, y0 = max(pt1[0], 0), max(pt1[1], 0)
+        x1, y1 = min(pt2[0] + 1, self.width), min(pt2[1] + 1, self.height)
+        patch = np.full((max(y1 - y0, 0), max(x1 - x0, 0), 3), color, dtype=np.uint8)
+        return (slice(y0, y1), slice(x0, x1)), patch, alpha
+    
+    def _blit_tint(self, frame: np.ndarray, tint: tuple):
+        """Mezcla en el fotograma un rectángulo preparado con _make_tint."""
+        roi, patch, alpha = tint
+        dst = frame[roi]
+        cv2.addWeighted(patch, alpha, dst, 1 - alpha, 0, dst)
+    
+    def _build_hud(self):
+        """
+        Prerrenderiza los textos fijos del HUD.
+        
+        Los prefijos "FPS: " y "Bolas capturadas: " se dibujan una vez a
+        partir de hud_origin; en cada fotograma solo se dibujan los
+        números, a continuación de su prefijo. Las subclases añaden sus
+        textos a _hud_rois, el aviso a _pause_rois y, si quieren un panel
+        de fondo, _panel_tint.
+        """
+        self._new_hud_layer()
+        
+        x, y = self.hud_origin
+        scale, color, thickness = self.hud_text_style
+        self._hud_rois = []
+        self._hud_rois.append(self._stamp_text("FPS: ", (x, y), scale, color, thickness))
+        self._hud_rois.append(self._stamp_text("Bolas capturadas: ", (x, y + 30), scale, color, thickness))
+        self._fps_org = (x + self._text_advance("FPS: ", scale, thickness), y)
+        self._balls_org = (x + self._text_advance("Bolas capturadas: ", scale, thickness), y + 30)
+        
+        self._pause_rois = []
+        self._panel_tint = None
+    
+    def _new_hud_layer(self):
+        """Crea la capa (vacía) donde _stamp_text prerrenderiza los textos."""
+        self._hud_layer = np.zeros((self.height, self.width, 3), dtype=np.uint8)
+        self._hud_mask = np.zeros((self.height, self.width, 1), dtype=bool)
+    
+    def _text_advance(self, prefix: str, scale: float, thickness: int) -> int:
+        """
+        Calcula dónde empieza el texto que sigue a un prefijo.
+        
+        getTextSize incluye el margen final del último glifo, así que se
+        mide el prefijo seguido de un dígito y se resta el dígito.
+        """
+        font = cv2.FONT_HERSHEY_SIMPLEX
+        with_digit = cv2.getTextSize(prefix + "0", font, scale, thickness)[0][0]
+        digit = cv2.getTextSize("0", font, scale, thickness)[0][0]
+        return with_digit - digit
+    
+    def _stamp_text(self, text: str, org: Tuple[int, int], scale: float,
+                    color: Tuple[int, int, int], thickness: int) -> Tuple[slice, slice]:
+        """
+        Dibuja un texto en la capa del HUD y devuelve la región que ocupa.
+        
+        Args:
+            text: Texto a dibujar
+            org: Origen (esquina inferior izquierda) como en cv2.putText
+            scale: Escala de la fuente
+            color: Color BGR
+            thickness: Grosor del trazo
+        
+        Returns:
+            Región (filas, columnas) del texto dentro del fotograma
+        """
+        canvas = np.zeros_like(self._hud_layer)
+        cv2.putText(canvas, text, org, cv2.FONT_HERSHEY_SIMPLEX, scale, color, thickness)
+        mask = canvas.any(axis=2)
+        np.copyto(self._hud_layer, canvas, where=mask[..., None])
+        self._hud_mask |= mask[..., None]
+        x, y, w, h = cv2.boundingRect(mask.astype(np.uint8))
+        return (slice(y, y + h), slice(x, x + w))
+    
+    def _blit_hud(self, frame: np.ndarray, rois: list):
+        """Copia en el fotograma los textos prerrenderizados de las regiones dadas."""
+        for roi in rois:
+            np.copyto(frame[roi], self._hud_layer[roi], where=self._hud_mask[roi])
+    
+    def _blit_text(self, frame: np.ndarray, text: str, org: Tuple[int, int], scale: float,
+                   color: Tuple[int, int, int], thickness: int):
+        """
+        Dibuja un texto como cv2.putText, copiando glifos prerrenderizados.
+        
+        Pensado para valores que cambian entre fotogramas (contadores,
+        FPS): cada carácter se rasteriza una sola vez y después solo se
+        copia su sprite, avanzando el origen carácter a carácter.
+        """
+        x, y = org
+        for char in text:
+            sprite, mask, dx, dy, advance = _glyph_sprite(char, scale, color, thickness)
+            self._blit_sprite(frame, sprite, mask, x + dx, y + dy)
+            x += advance
+    
+    def _blit_sprite(self, frame: np.ndarray, sprite: np.ndarray, mask: np.ndarray,
+                     x0: int, y0: int):
+        """
+        Copia los píxeles de un sprite con máscara, recortado al fotograma.
+        
+        Args:
+            frame: Fotograma destino
+            sprite: Imagen BGR del sprite
+            mask: Máscara (alto, ancho, 1) de los píxeles a copiar
+            x0: Columna del fotograma donde cae la esquina izquierda del sprite
+            y0: Fila del fotograma donde cae la esquina superior del sprite
+        """
+        h, w = sprite.shape[:2]
+        
+        # Recortar a los límites del fotograma
+        fx0, fy0 = max(x0, 0), max(y0, 0)
+        fx1, fy1 = min(x0 + w, frame.shape[1]), min(y0 + h, frame.shape[0])
+        if fx0 >= fx1 or fy0 >= fy1:
+            return
+        sy, sx = slice(fy0 - y0, fy1 - y0), slice(fx0 - x0, fx1 - x0)
+        np.copyto(frame[fy0:fy1, fx0:fx1], sprite[sy, sx], where=mask[sy, sx])
+    
+    def _draw_ui(self, frame: np.ndarray):
+        """Dibuja la interfaz de usuario (FPS, bolas capturadas, pausa)."""
+        # Panel de información
+        if self._panel_tint is not None:
+            self._blit_tint(frame, self._panel_tint)
+        
+        # Prefijos prerrenderizados y números desde el atlas de glifos
+        scale, color, thickness = self.hud_text_style
+        self._blit_hud(frame, self._hud_rois)
+        self._blit_text(frame, self.fps_text, self._fps_org, scale, color, thickness)
+        self._blit_text(frame, str(self.physics_world.balls_caught), self._balls_org,
+                        scale, color, thickness)
+        
+        # Pausado
+        if self.paused:
+            self._blit_hud(frame, self._pause_rois)
+    
+    def _draw_bucket_fill(self, frame: np.ndarray):
+        """Dibuja el fondo de la zona de captura (por defecto ninguno)."""
+        pass
+    
+    @abstractmethod
+    def _draw_bucket(self, frame: np.ndarray):
+        """Dibuja el borde y el texto de la zona de captura."""
+    
+    def _platform_polygon(self, x: float, y: float, angle: float) -> np.ndarray:
+        """
+        Calcula las esquinas de la plataforma rotada y trasladada.
+        
+        Redondea al entero más cercano (como np.rint; truncar desplazaba
+        el polígono medio píxel) y escribe en un buffer persistente, que
+        se sobrescribe en la siguiente llamada. El cálculo lo hace
+        _rotate_rect, compilado con Numba si está instalado.
+        
+        Args:
+            x: Posición x del centro
+            y: Posición y del centro
+            angle: Ángulo en radianes
+        
+        Returns:
+            Array (4, 2) int32 con las esquinas
+        """
+        half_w, half_h = self._platform_half
+        _rotate_rect(math.cos(angle), math.sin(angle), float(x), float(y),
+                     half_w, half_h, self._corners_i32)
+        return self._corners_i32
+    
+    @abstractmethod
+    def _draw_platform(self, frame: np.ndarray, x: float, y: float, angle: float):
+        """Dibuja la plataforma en el fotograma."""
+    
+    @abstractmethod
+    def _draw_ball(self, frame: np.ndarray, x: int, y: int, radius: int):
+        """Dibuja una bola en el fotograma."""
+    
+    def _ball_sprite(self, radius: int) -> Tuple[np.ndarray, np.ndarray, int, int]:
+        """
+        Devuelve el sprite de una bola del radio dado (se dibuja una vez).
+        
+        El sprite se obtiene con _draw_ball, así que cada versión conserva
+        su estilo. La máscara marca los píxeles que cambian al dibujar
+        sobre fondo negro o blanco, para no depender de los colores.
+        
+        Args:
+            radius: Radio de la bola en píxeles
+        
+        Returns:
+            Tupla (sprite, máscara, ox, oy), donde (ox, oy) es la posición
+            del centro de la bola dentro del sprite
+        """
+        cached = self._ball_sprites.get(radius)
+        if cached is not None:
+            return cached
+        
+        # Lienzo holgado para sombras y bordes desplazados
+        center = 2 * radius + 4
+        size = 2 * center + 1
+        on_black = np.zeros((size, size, 3), dtype=np.uint8)
+        on_white = np.full((size, size, 3), 255, dtype=np.uint8)
+        self._draw_ball(on_black, center, center, radius)
+        self._draw_ball(on_white, center, center, radius)
+        mask = (on_black != 0).any(axis=2) | (on_white != 255).any(axis=2)
+        
+        # Recortar al rectángulo que ocupa la bola
+        x, y, w, h = cv2.boundingRect(mask.astype(np.uint8))
+        sprite = on_black[y:y + h, x:x + w].copy()
+        mask = mask[y:y + h, x:x + w, None].copy()
+        cached = (sprite, mask, center - x, center - y)
+        self._ball_sprites[radius] = cached
+        return cached
+    
+    @abstractmethod
+    def _draw_walls(self, frame: np.ndarray):
+        """Dibuja las paredes en el fotograma."""
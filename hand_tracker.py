@@ -5,6 +5,7 @@ Este módulo proporciona la clase HandTracker que utiliza MediaPipe Hands
 para detectar la posición y orientación de la mano en tiempo real.
 """
 
+import math
 import mediapipe as mp
 import numpy as np
 import cv2
@@ -20,23 +21,55 @@ class HandTracker:
     - Ángulo de rotación (orientación) de la mano
     """
     
-    def __init__(self, max_num_hands: int = 1, min_detection_confidence: float = 0.5):
+    def __init__(self, max_num_hands: int = 1, min_detection_confidence: float = 0.5,
+                 min_tracking_confidence: float = 0.5,
+                 input_size: Optional[Tuple[int, int]] = (320, 240),
+                 model_complexity: int = 0):
         """
         Inicializa el rastreador de manos.
         
+        En modo vídeo MediaPipe solo ejecuta el detector de palma cuando
+        la confianza del seguimiento cae por debajo de
+        min_tracking_confidence; el resto de fotogramas reutiliza la
+        región de la mano del fotograma anterior.
+        
         Args:
             max_num_hands: Número máximo de manos a detectar
             min_detection_confidence: Confianza mínima para la detección
+            min_tracking_confidence: Confianza mínima para seguir la mano
+                sin volver a ejecutar el detector de palma
+            input_size: Tamaño (ancho, alto) al que se reduce el fotograma
+                antes de la detección, o None para usarlo tal cual
+            model_complexity: Modelo de landmarks de MediaPipe: 0 (lite,
+                más rápido) o 1 (completo, algo más preciso)
         """
         self.mp_hands = mp.solutions.hands
         self.hands = self.mp_hands.Hands(
             static_image_mode=False,
             max_num_hands=max_num_hands,
+            model_complexity=model_complexity,
             min_detection_confidence=min_detection_confidence,
-            min_tracking_confidence=0.5
+            min_tracking_confidence=min_tracking_confidence
         )
         self.mp_drawing = mp.solutions.drawing_utils
         
+        # Buffer de entrada RGB persistente (se reutiliza entre fotogramas)
+        self.input_size = input_size
+        self._input_buf = None
+        self._small_buf = None
+        
+        # Cadenas de conexiones por dedo (muñeca -> punta)
+        self._finger_chains = [
+            np.array([0, 1, 2, 3, 4]),  # Pulgar
+            np.array([0, 5, 6, 7, 8]),  # Índice
+            np.array([0, 9, 10, 11, 12]),  # Dedo medio
+            np.array([0, 13, 14, 15, 16]),  # Anular
+            np.array([0, 17, 18, 19, 20])  # Meñique
+        ]
+        
+        # Etiquetas de los puntos pre-rasterizadas una sola vez
+        self._label_idx, self._label_dy, self._label_dx = self._build_label_pixels()
+        
     def detect_hand(self, frame: np.ndarray) -> Tuple[Optional[np.ndarray], Optional[float], Optional[Tuple[float, float]]]:
         """
         Detecta la mano en un fotograma.
@@ -50,32 +83,49 @@ class HandTracker:
             - angle: Ángulo de rotación de la mano en radianes o None
             - position: Tupla (x, y) del centro de la palma o None
         """
-        # Convertir BGR a RGB
-        frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        results = self.hands.process(frame_rgb)
+        # Buffer de entrada RGB persistente. Si input_size está definido,
+        # el fotograma se reduce antes (MediaPipe trabaja internamente a
+        # 256x256, así que los píxeles extra no aportan)
+        h, w = frame.shape[:2]
+        src = frame
+        if self.input_size is not None and self.input_size != (w, h):
+            in_w, in_h = self.input_size
+            if self._small_buf is None or self._small_buf.shape[2] != frame.shape[2]:
+                self._small_buf = np.empty((in_h, in_w, frame.shape[2]), dtype=frame.dtype)
+            src = cv2.resize(frame, self.input_size, dst=self._small_buf,
+                             interpolation=cv2.INTER_AREA)
+        
+        if self._input_buf is None or self._input_buf.shape != src.shape:
+            self._input_buf = np.empty_like(src)
+        cv2.cvtColor(src, cv2.COLOR_BGR2RGB, dst=self._input_buf)
+        
+        results = self.hands.process(self._input_buf)
         
         if results.multi_hand_landmarks and len(results.multi_hand_landmarks) > 0:
             landmarks = results.multi_hand_landmarks[0]
             
-            # Convertir landmarks a array numpy
-            h, w, c = frame.shape
-            landmarks_array = np.array([
-                [lm.x * w, lm.y * h, lm.z] for lm in landmarks.landmark
-            ])
+            # Coordenadas normalizadas -> píxeles del fotograma original (w, h)
             
-            # Calcular posición (centro de la palma)
-            # Usamos la muñeca (punto 0) como referencia
-            wrist = landmarks_array[0]
-            position = (wrist[0], wrist[1])
+            # Posición y ángulo directamente desde los landmarks de MediaPipe
+            # Punto 0: Muñeca (WRIST)
+            # Punto 9: Articulación MCP del dedo medio (MIDDLE_FINGER_MCP)
+            wrist = landmarks.landmark[0]
+            middle_mcp = landmarks.landmark[9]
+            position = (wrist.x * w, wrist.y * h)
+            angle = self._calculate_hand_angle(wrist, middle_mcp, w, h)
             
-            # Calcular ángulo de rotación
-            angle = self._calculate_hand_angle(landmarks_array)
+            # Convertir landmarks a array numpy (para dibujo)
+            landmarks_array = np.empty((21, 3), dtype=np.float32)
+            for i, lm in enumerate(landmarks.landmark):
+                landmarks_array[i, 0] = lm.x * w
+                landmarks_array[i, 1] = lm.y * h
+                landmarks_array[i, 2] = lm.z
             
             return landmarks_array, angle, position
         
         return None, None, None
     
-    def _calculate_hand_angle(self, landmarks: np.ndarray) -> float:
+    def _calculate_hand_angle(self, wrist, middle_mcp, w: int, h: int) -> float:
         """
         Calcula el ángulo de rotación de la mano.
         
@@ -88,60 +138,78 @@ class HandTracker:
         - Rango: [-π, π] radianes
         
         Args:
-            landmarks: Array de 21 puntos de referencia
+            wrist: Landmark de la muñeca (coordenadas normalizadas)
+            middle_mcp: Landmark del dedo medio (coordenadas normalizadas)
+            w: Ancho del fotograma
+            h: Alto del fotograma
             
         Returns:
             Ángulo en radianes
         """
-        # Punto 0: Muñeca (WRIST)
-        # Punto 9: Articulación MCP del dedo medio (MIDDLE_FINGER_MCP)
-        wrist = landmarks[0]
-        middle_mcp = landmarks[9]
-        
-        # Vector desde muñeca hasta dedo medio
-        vector = middle_mcp[:2] - wrist[:2]
+        # Vector desde muñeca hasta dedo medio (en píxeles)
+        vx = (middle_mcp.x - wrist.x) * w
+        vy = (middle_mcp.y - wrist.y) * h
         
         # Calcular ángulo usando arctan2
-        angle = np.arctan2(vector[1], vector[0])
+        angle = math.atan2(vy, vx)
         
         return angle
     
-    def draw_landmarks(self, frame: np.ndarray, landmarks: np.ndarray) -> np.ndarray:
+    def draw_landmarks(self, frame: np.ndarray, landmarks: np.ndarray, copy: bool = True) -> np.ndarray:
         """
         Dibuja los puntos de referencia en el fotograma.
         
         Args:
             frame: Fotograma de OpenCV
             landmarks: Array de puntos de referencia
+            copy: Si es False, dibuja directamente sobre frame
             
         Returns:
             Fotograma con los puntos dibujados
         """
-        frame_copy = frame.copy()
+        frame_copy = frame.copy() if copy else frame
+        pts = landmarks[:, :2].astype(np.int32)
         
         # Dibujar puntos
-        for i, landmark in enumerate(landmarks):
-            x, y = int(landmark[0]), int(landmark[1])
+        for x, y in pts.tolist():
             cv2.circle(frame_copy, (x, y), 3, (0, 255, 0), -1)
-            cv2.putText(frame_copy, str(i), (x + 5, y), 
-                       cv2.FONT_HERSHEY_SIMPLEX, 0.3, (255, 255, 255), 1)
-        
-        # Dibujar conexiones principales
-        connections = [
-            (0, 1), (1, 2), (2, 3), (3, 4),  # Pulgar
-            (0, 5), (5, 6), (6, 7), (7, 8),  # Índice
-            (0, 9), (9, 10), (10, 11), (11, 12),  # Dedo medio
-            (0, 13), (13, 14), (14, 15), (15, 16),  # Anular
-            (0, 17), (17, 18), (18, 19), (19, 20)  # Meñique
-        ]
         
-        for start, end in connections:
-            pt1 = tuple(landmarks[start][:2].astype(int))
-            pt2 = tuple(landmarks[end][:2].astype(int))
-            cv2.line(frame_copy, pt1, pt2, (0, 255, 0), 2)
+        # Dibujar etiquetas (todas en una sola asignación). Quedan encima de
+        # todos los puntos, no solo del suyo, y en los bordes se recortan por
+        # píxel: no es idéntico a un putText tras cada círculo
+        h, w = frame_copy.shape[:2]
+        ys = pts[self._label_idx, 1] + self._label_dy
+        xs = pts[self._label_idx, 0] + 5 + self._label_dx
+        visible = (ys >= 0) & (ys < h) & (xs >= 0) & (xs < w)
+        frame_copy[ys[visible], xs[visible]] = 255
+        
+        # Dibujar conexiones principales (una polilínea por dedo)
+        cv2.polylines(frame_copy, [pts[chain] for chain in self._finger_chains],
+                      False, (0, 255, 0), 2)
         
         return frame_copy
     
+    def _build_label_pixels(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Rasteriza los números 0-20 una vez y guarda sus píxeles.
+        
+        Returns:
+            Tupla (índice del punto, dy, dx) de cada píxel encendido,
+            relativo a la posición de origen de cv2.putText
+        """
+        font = cv2.FONT_HERSHEY_SIMPLEX
+        pad = 2
+        idx, dys, dxs = [], [], []
+        for i in range(21):
+            (tw, th), baseline = cv2.getTextSize(str(i), font, 0.3, 1)
+            canvas = np.zeros((th + baseline + 2 * pad, tw + 2 * pad), dtype=np.uint8)
+            cv2.putText(canvas, str(i), (pad, pad + th), font, 0.3, 255, 1)
+            yy, xx = np.nonzero(canvas)
+            idx.append(np.full(len(yy), i))
+            dys.append(yy - pad - th)
+            dxs.append(xx - pad)
+        return np.concatenate(idx), np.concatenate(dys), np.concatenate(dxs)
+    
     def release(self):
         """Libera los recursos de MediaPipe."""
         self.hands.close()
@@ -4,9 +4,79 @@ Módulo para el seguimiento de manos usando OpenCV.
 Detecta la mano usando color de piel y excluye la cara.
 """
 
+import math
 import cv2
 import numpy as np
 from typing import Tuple, Optional
+from utils import NUMBA_AVAILABLE, njit
+
+
+@njit(fastmath=True, cache=True)
+def _skin_mask_fused(bgr, face_boxes, roi_x_start, lo, hi, out, gray, write_gray):
+    """
+    Calcula la máscara de piel en una sola pasada sobre el fotograma.
+    
+    Fusiona BGR->HSV, el umbral de piel, la exclusión de caras y la
+    ROI de la mitad derecha: lee cada píxel BGR una vez y escribe 0/255.
+    Usa la misma escala que OpenCV para 8 bits (H: 0-180, S y V: 0-255).
+    Opcionalmente escribe también la imagen en gris (luminancia BT.601,
+    ±1 respecto a COLOR_BGR2GRAY) para el detector de caras.
+    
+    Args:
+        bgr: Fotograma BGR (H x W x 3, uint8)
+        face_boxes: Cajas de cara (N x 4) como (x1, y1, x2, y2), inclusivas
+        roi_x_start: Columna a partir de la cual se busca la mano
+        lo: Límite inferior HSV
+        hi: Límite superior HSV
+        out: Máscara de salida (H x W, uint8)
+        gray: Imagen en gris de salida (H x W, uint8)
+        write_gray: Si es False, gray no se escribe
+    """
+    h, w = out.shape
+    n_faces = face_boxes.shape[0]
+    for y in range(h):
+        for x in range(w):
+            b = np.int32(bgr[y, x, 0])
+            g = np.int32(bgr[y, x, 1])
+            r = np.int32(bgr[y, x, 2])
+            if write_gray:
+                # Luminancia BT.601 en coma fija (pesos 0.299/0.587/0.114);
+                # puede diferir en ±1 de COLOR_BGR2GRAY por el redondeo,
+                # indiferente para el detector de caras
+                gray[y, x] = (r * 4899 + g * 9617 + b * 1868 + 8192) >> 14
+            
+            out[y, x] = 0
+            if x < roi_x_start:
+                continue
+            
+            in_face = False
+            for k in range(n_faces):
+                if (face_boxes[k, 0] <= x <= face_boxes[k, 2] and
+                        face_boxes[k, 1] <= y <= face_boxes[k, 3]):
+                    in_face = True
+                    break
+            if in_face:
+                continue
+            
+            v = max(b, g, r)
+            diff = v - min(b, g, r)
+            
+            s = (diff * 255 + v // 2) // v if v > 0 else 0
+            if diff == 0:
+                hue = 0.0
+            elif v == r:
+                hue = 30.0 * (g - b) / diff
+            elif v == g:
+                hue = 60.0 + 30.0 * (b - r) / diff
+            else:
+                hue = 120.0 + 30.0 * (r - g) / diff
+            if hue < 0:
+                hue += 180.0
+            hh = np.int32(hue + 0.5)
+            
+            if (lo[0] <= hh <= hi[0] and lo[1] <= s <= hi[1] and
+                    lo[2] <= v <= hi[2]):
+                out[y, x] = 255
 
 
 class HandTrackerOpenCV:
@@ -16,20 +86,75 @@ class HandTrackerOpenCV:
     Utiliza detección de color de piel y excluye la cara.
     """
     
-    def __init__(self):
-        """Inicializa el rastreador de manos."""
-        # Rango HSV para piel
-        self.lower_skin = np.array([0, 20, 70], dtype=np.uint8)
-        self.upper_skin = np.array([20, 255, 255], dtype=np.uint8)
+    def __init__(self, use_opencl: bool = False):
+        """
+        Inicializa el rastreador de manos.
         
-        # Kernel para morfología
-        self.kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (11, 11))
+        Args:
+            use_opencl: Ejecutar la máscara de piel y la morfología con
+                cv2.UMat (T-API de OpenCL). Conviene medir en el equipo
+                de destino: no siempre es más rápido que la CPU. Solo
+                se activa si hay un dispositivo OpenCL.
+        """
+        # setUseOpenCL afecta a todo el proceso: solo se toca si se pide
+        self.use_opencl = use_opencl and cv2.ocl.haveOpenCL()
+        if self.use_opencl:
+            cv2.ocl.setUseOpenCL(True)
+        
+        # Rango HSV para piel como (inferior, superior), tuplas que
+        # cv2.inRange recibe como Scalar. Se publica en una sola asignación
+        # porque la ventana de la máscara lo cambia desde el hilo principal
+        # mientras detect_hand lo lee en el de detección
+        self.skin_range = ((0, 20, 70), (20, 255, 255))
+        
+        # Factor de reducción: el procesamiento se hace a 1/2 de resolución
+        self.downscale = 2
+        
+        # Kernel para morfología (equivale a 11x11 a resolución completa).
+        # Rectangular: OpenCV lo descompone en pasadas de fila y columna
+        # (~30% menos que la elipse). La máscara cambia solo en las esquinas
+        # del kernel: unas decenas de píxeles en el borde de la mano y
+        # centroides a menos de 0.1 px de los de la elipse
+        ksize = (11 // self.downscale) | 1
+        self.kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (ksize, ksize))
         
         # Detector de cara
         self.face_cascade = cv2.CascadeClassifier(
             cv2.data.haarcascades + 'haarcascade_frontalface_default.xml'
         )
         
+        # Caché de caras (x1, y1, x2, y2): se re-detectan cada N fotogramas
+        self._face_cache = np.empty((0, 4), dtype=np.int32)
+        self._frame_count = 0
+        self._redetect_every = 15
+        self._face_version = 0
+        
+        # Máscara de búsqueda cacheada (mitad derecha sin caras)
+        self._search_mask = None
+        self._search_umat = None
+        self._mask_shape = None
+        self._mask_face_version = -1
+        
+        # Región de seguimiento (x1, y1, x2, y2) en el fotograma reducido:
+        # tras detectar la mano, el siguiente fotograma solo se procesa
+        # alrededor de ella. Margen a resolución completa
+        self.track_margin = 60
+        self._track_region = None
+        
+        # Última máscara calculada y su región (para visualización), como
+        # una tupla (máscara, región): se publica en una sola asignación
+        # porque detect_hand y draw_hand_mask corren en hilos distintos
+        self._last_mask_region = None
+        
+        # Cadenas de conexiones por dedo (centro -> punta)
+        self._finger_chains = [
+            np.array([0, 1, 2, 3, 4]),
+            np.array([0, 5, 6, 7, 8]),
+            np.array([0, 9, 10, 11, 12]),
+            np.array([0, 13, 14, 15, 16]),
+            np.array([0, 17, 18, 19, 20])
+        ]
+        
     def detect_hand(self, frame: np.ndarray) -> Tuple[Optional[np.ndarray], Optional[float], Optional[Tuple[float, float]]]:
         """
         Detecta la mano en un fotograma.
@@ -42,85 +167,241 @@ class HandTrackerOpenCV:
         """
         h, w = frame.shape[:2]
         
-        # Detectar caras
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-        faces = self.face_cascade.detectMultiScale(gray, 1.3, 5)
-        
-        # Crear máscara excluyendo caras
-        face_mask = np.ones((h, w), dtype=np.uint8) * 255
-        for (x, y, fw, fh) in faces:
-            # Expandir región de la cara
-            margin = 40
-            x1 = max(0, x - margin)
-            y1 = max(0, y - margin)
-            x2 = min(w, x + fw + margin)
-            y2 = min(h, y + fh + margin)
-            cv2.rectangle(face_mask, (x1, y1), (x2, y2), 0, -1)
-        
-        # Convertir a HSV
-        hsv = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV)
-        
-        # Detectar piel
-        skin_mask = cv2.inRange(hsv, self.lower_skin, self.upper_skin)
+        # Procesar una copia reducida del fotograma
+        scale = self.downscale
+        small = cv2.resize(frame, (w // scale, h // scale),
+                           interpolation=cv2.INTER_AREA)
         
-        # Aplicar máscara de cara
-        skin_mask = cv2.bitwise_and(skin_mask, face_mask)
+        # Las caras se re-detectan solo cada N fotogramas
+        redetect = self._frame_count % self._redetect_every == 0
+        self._frame_count += 1
         
-        # Limitar a mitad derecha (donde está la mano)
-        roi_mask = np.zeros((h, w), dtype=np.uint8)
-        roi_mask[:, w//2:] = 255
-        skin_mask = cv2.bitwise_and(skin_mask, roi_mask)
+        # Buscar solo alrededor de la mano anterior; si se perdió, o al
+        # re-detectar caras (necesita el fotograma entero), en todo él
+        region = None if redetect else self._track_region
+        self._track_region = None
         
-        # Morfología
-        skin_mask = cv2.morphologyEx(skin_mask, cv2.MORPH_CLOSE, self.kernel)
-        skin_mask = cv2.morphologyEx(skin_mask, cv2.MORPH_OPEN, self.kernel)
+        # Máscara de la mano (piel, sin caras, mitad derecha, morfología)
+        skin_mask = self._compute_mask(small, redetect, region)
+        self._last_mask_region = (skin_mask, region)
         
-        # Encontrar contornos
-        contours, _ = cv2.findContours(skin_mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        # Encontrar contornos (en coordenadas del fotograma reducido)
+        offset = (0, 0) if region is None else (region[0], region[1])
+        contours, _ = cv2.findContours(skin_mask, cv2.RETR_EXTERNAL,
+                                       cv2.CHAIN_APPROX_TC89_KCOS, offset=offset)
         
         if len(contours) == 0:
             return None, None, None
         
-        # Contorno más grande
-        hand_contour = max(contours, key=cv2.contourArea)
-        area = cv2.contourArea(hand_contour)
+        # Contorno más grande (un único argmax sobre las áreas)
+        areas = np.fromiter((cv2.contourArea(c) for c in contours),
+                            dtype=np.float64, count=len(contours))
+        largest = int(np.argmax(areas))
+        hand_contour = contours[largest]
+        area = areas[largest]
         
-        # Filtrar por área
-        if area < 5000 or area > 150000:
+        # Filtrar por área (umbrales a resolución completa)
+        area_scale = scale * scale
+        if area < 5000 / area_scale or area > 150000 / area_scale:
             return None, None, None
         
-        # Calcular centro
-        M = cv2.moments(hand_contour)
-        if M["m00"] == 0:
+        # Región de seguimiento para el siguiente fotograma
+        small_contour = hand_contour
+        
+        # Volver a coordenadas de resolución completa
+        hand_contour = hand_contour * scale
+        
+        # Calcular centro y ángulo a partir del contorno
+        axis = self._contour_axis(hand_contour)
+        if axis is None:
             return None, None, None
         
-        cx = int(M["m10"] / M["m00"])
-        cy = int(M["m01"] / M["m00"])
+        cx, cy, angle = axis
         
         # Verificar que esté en la mitad derecha
         if cx < w // 2:
             return None, None, None
         
         position = (cx, cy)
-        
-        # Calcular ángulo
-        angle = self._calculate_angle(hand_contour)
+        self._track_region = self._region_around(small_contour, small.shape[:2])
         
         # Generar landmarks
         landmarks = self._generate_landmarks(hand_contour, cx, cy)
         
         return landmarks, angle, position
     
-    def _calculate_angle(self, contour: np.ndarray) -> float:
-        """Calcula el ángulo del contorno."""
-        if len(contour) < 5:
-            return 0.0
+    def _region_around(self, contour: np.ndarray, shape: Tuple[int, int]) -> Tuple[int, int, int, int]:
+        """
+        Calcula la región de seguimiento alrededor de un contorno.
+        
+        Args:
+            contour: Contorno de la mano en el fotograma reducido
+            shape: Tamaño (alto, ancho) del fotograma reducido
+            
+        Returns:
+            Región (x1, y1, x2, y2) con margen, recortada al fotograma
+        """
+        sh, sw = shape
+        pad = self.track_margin // self.downscale
+        x, y, w, h = cv2.boundingRect(contour)
+        return (max(0, x - pad), max(0, y - pad),
+                min(sw, x + w + pad), min(sh, y + h + pad))
+    
+    def _compute_mask(self, small: np.ndarray, redetect: bool,
+                      region: Optional[Tuple[int, int, int, int]] = None) -> np.ndarray:
+        """
+        Calcula la máscara binaria de la mano sobre el fotograma reducido.
+        
+        Args:
+            small: Fotograma BGR reducido
+            redetect: Si hay que volver a detectar caras en este fotograma
+            region: Región (x1, y1, x2, y2) a procesar, o None para todo
+                el fotograma
+            
+        Returns:
+            Máscara (uint8, 0/255) tras la morfología, del tamaño de la región
+        """
+        sh, sw = small.shape[:2]
+        if region is not None:
+            x1, y1, x2, y2 = region
+            small = small[y1:y2, x1:x2]
+        else:
+            x1 = y1 = 0
+        lower, upper = self.skin_range
+        
+        if NUMBA_AVAILABLE and not self.use_opencl:
+            # Piel + caras + mitad derecha (+ gris) en una sola pasada
+            rh, rw = small.shape[:2]
+            skin_mask = np.empty((rh, rw), dtype=np.uint8)
+            if redetect:
+                gray = np.empty((rh, rw), dtype=np.uint8)
+                _skin_mask_fused(small, self._face_cache[:0], sw // 2 - x1,
+                                 lower, upper,
+                                 skin_mask, gray, True)
+                self._detect_faces(gray)
+                for (fx1, fy1, fx2, fy2) in self._face_cache:
+                    cv2.rectangle(skin_mask, (int(fx1), int(fy1)), (int(fx2), int(fy2)), 0, -1)
+            else:
+                faces = self._face_cache - (x1, y1, x1, y1) if region is not None else self._face_cache
+                _skin_mask_fused(small, faces, sw // 2 - x1,
+                                 lower, upper,
+                                 skin_mask, skin_mask[:0, :0], False)
+        else:
+            if redetect:
+                self._detect_faces(cv2.cvtColor(small, cv2.COLOR_BGR2GRAY))
+            skin_mask = self._skin_mask_cv(small, (sh, sw), region, (lower, upper))
+        
+        # Morfología: cierre y apertura siguen siendo dos llamadas. Con kernel
+        # rectangular las dos erosiones centrales se podrían unir en una de
+        # (2k-1)x(2k-1), pero el resultado es el mismo y no es más rápido
+        skin_mask = cv2.morphologyEx(skin_mask, cv2.MORPH_CLOSE, self.kernel)
+        skin_mask = cv2.morphologyEx(skin_mask, cv2.MORPH_OPEN, self.kernel)
+        
+        # findContours necesita un ndarray
+        if isinstance(skin_mask, cv2.UMat):
+            skin_mask = skin_mask.get()
+        
+        return skin_mask
+    
+    def _detect_faces(self, gray: np.ndarray):
+        """Detecta caras y actualiza la caché de cajas expandidas."""
+        sh, sw = gray.shape[:2]
+        faces = self.face_cascade.detectMultiScale(gray, 1.3, 5)
+        
+        # Expandir región de la cara
+        margin = 40 // self.downscale
+        self._face_cache = np.array([
+            (max(0, x - margin), max(0, y - margin),
+             min(sw, x + fw + margin), min(sh, y + fh + margin))
+            for (x, y, fw, fh) in faces
+        ], dtype=np.int32).reshape(-1, 4)
+        self._face_version += 1
+    
+    def _skin_mask_cv(self, frame: np.ndarray, shape: Optional[Tuple[int, int]] = None,
+                      region: Optional[Tuple[int, int, int, int]] = None,
+                      skin_range: Optional[Tuple[Tuple[int, int, int], Tuple[int, int, int]]] = None) -> np.ndarray:
+        """
+        Calcula la máscara de piel con operaciones de OpenCV.
+        
+        Con use_opencl las operaciones se encadenan sobre cv2.UMat y el
+        resultado sigue en el dispositivo hasta después de la morfología.
+        
+        Args:
+            frame: Fotograma BGR reducido (o su región de seguimiento)
+            shape: Tamaño del fotograma reducido completo (por defecto el de frame)
+            region: Región (x1, y1, x2, y2) que ocupa frame, o None
+            skin_range: Rango HSV (inferior, superior); por defecto skin_range
+        """
+        lower, upper = skin_range or self.skin_range
+        src = cv2.UMat(frame) if self.use_opencl else frame
+        
+        # Convertir a HSV
+        hsv = cv2.cvtColor(src, cv2.COLOR_BGR2HSV)
+        
+        # Detectar piel
+        skin_mask = cv2.inRange(hsv, lower, upper)
+        
+        # Aplicar máscara de caras y mitad derecha (en el mismo buffer)
+        search_mask = self._get_search_mask(shape or frame.shape[:2])
+        if region is not None:
+            x1, y1, x2, y2 = region
+            if self.use_opencl:
+                search_mask = cv2.UMat(search_mask, (y1, y2), (x1, x2))
+            else:
+                search_mask = search_mask[y1:y2, x1:x2]
+        skin_mask = cv2.bitwise_and(skin_mask, search_mask, dst=skin_mask)
+        
+        return skin_mask
+    
+    def _get_search_mask(self, shape: Tuple[int, int]) -> np.ndarray:
+        """
+        Devuelve la máscara de búsqueda: mitad derecha excluyendo caras.
+        
+        Solo se reconstruye cuando cambia el tamaño del fotograma o
+        se vuelven a detectar las caras.
+        """
+        if self._mask_shape != shape:
+            self._search_mask = np.empty(shape, dtype=np.uint8)
+            self._mask_shape = shape
+            self._mask_face_version = -1
         
-        ellipse = cv2.fitEllipse(contour)
-        angle = ellipse[2]
-        angle_rad = np.radians(angle - 90)
+        if self._mask_face_version != self._face_version:
+            h, w = shape
+            
+            # Limitar a mitad derecha (donde está la mano)
+            self._search_mask[:, :w//2] = 0
+            self._search_mask[:, w//2:] = 255
+            
+            # Excluir caras
+            for (x1, y1, x2, y2) in self._face_cache:
+                cv2.rectangle(self._search_mask, (int(x1), int(y1)), (int(x2), int(y2)), 0, -1)
+            
+            self._mask_face_version = self._face_version
+            if self.use_opencl:
+                self._search_umat = cv2.UMat(self._search_mask)
         
-        return angle_rad
+        return self._search_umat if self.use_opencl else self._search_mask
+    
+    def _contour_axis(self, contour: np.ndarray) -> Optional[Tuple[int, int, float]]:
+        """
+        Calcula el centro y el ángulo del eje principal del contorno.
+        
+        Centro de masas del área encerrada y ángulo a partir de los momentos
+        centrales de segundo orden:
+        ángulo = 0.5 * arctan2(2 * mu11, mu20 - mu02)
+        
+        Returns:
+            Tupla (cx, cy, ángulo) o None si el contorno es degenerado
+        """
+        M = cv2.moments(contour)
+        if M["m00"] == 0:
+            return None
+        
+        cx = int(M["m10"] / M["m00"])
+        cy = int(M["m01"] / M["m00"])
+        angle = 0.5 * math.atan2(2 * M["mu11"], M["mu20"] - M["mu02"])
+        
+        return cx, cy, angle
     
     def _generate_landmarks(self, contour: np.ndarray, cx: int, cy: int) -> np.ndarray:
         """Genera puntos de referencia del contorno."""
@@ -131,45 +412,31 @@ class HandTrackerOpenCV:
         
         # Aproximar contorno
         epsilon = 0.01 * cv2.arcLength(contour, True)
-        approx = cv2.approxPolyDP(contour, epsilon, True)
+        approx = cv2.approxPolyDP(contour, epsilon, True).reshape(-1, 2)
         
         # Distribuir puntos
         num_points = min(20, len(approx))
-        for i in range(num_points):
-            pt = approx[i][0]
-            landmarks[i+1] = [pt[0], pt[1], 0]
+        landmarks[1:num_points+1, :2] = approx[:num_points]
         
-        # Rellenar faltantes
-        for i in range(num_points+1, 21):
-            landmarks[i] = landmarks[i-1]
+        # Rellenar faltantes con el último punto
+        landmarks[num_points+1:, :2] = landmarks[num_points, :2]
         
         return landmarks
     
-    def draw_landmarks(self, frame: np.ndarray, landmarks: np.ndarray) -> np.ndarray:
-        """Dibuja los puntos de referencia."""
+    def draw_landmarks(self, frame: np.ndarray, landmarks: np.ndarray, copy: bool = True) -> np.ndarray:
+        """Dibuja los puntos de referencia (sobre frame si copy es False)."""
         if landmarks is None:
             return frame
         
-        frame_copy = frame.copy()
+        frame_copy = frame.copy() if copy else frame
+        pts = landmarks[:, :2].astype(np.int32)
         
-        # Dibujar conexiones
-        connections = [
-            (0, 1), (1, 2), (2, 3), (3, 4),
-            (0, 5), (5, 6), (6, 7), (7, 8),
-            (0, 9), (9, 10), (10, 11), (11, 12),
-            (0, 13), (13, 14), (14, 15), (15, 16),
-            (0, 17), (17, 18), (18, 19), (19, 20)
-        ]
-        
-        for start, end in connections:
-            if start < len(landmarks) and end < len(landmarks):
-                pt1 = tuple(landmarks[start][:2].astype(int))
-                pt2 = tuple(landmarks[end][:2].astype(int))
-                cv2.line(frame_copy, pt1, pt2, (0, 255, 0), 2)
+        # Dibujar conexiones (una polilínea por dedo)
+        cv2.polylines(frame_copy, [pts[chain] for chain in self._finger_chains],
+                      False, (0, 255, 0), 2)
         
         # Dibujar puntos
-        for i, landmark in enumerate(landmarks):
-            x, y = int(landmark[0]), int(landmark[1])
+        for i, (x, y) in enumerate(pts.tolist()):
             if i == 0:
                 cv2.circle(frame_copy, (x, y), 8, (0, 0, 255), -1)
             else:
@@ -177,6 +444,122 @@ class HandTrackerOpenCV:
         
         return frame_copy
     
+    def adjust_skin_range(self, lower: Tuple[int, int, int], upper: Tuple[int, int, int]):
+        """
+        Ajusta el rango HSV de detección de piel.
+        
+        Args:
+            lower: Límite inferior (H, S, V)
+            upper: Límite superior (H, S, V)
+        """
+        self.skin_range = (tuple(int(v) for v in lower),
+                           tuple(int(v) for v in upper))
+    
+    def draw_hand_mask(self, frame: np.ndarray) -> np.ndarray:
+        """
+        Devuelve la máscara de detección del último fotograma.
+        
+        Reutiliza la máscara calculada en detect_hand (a resolución
+        reducida) en lugar de repetir todo el procesamiento.
+        """
+        h, w = frame.shape[:2]
+        # Una sola lectura: máscara y región siempre del mismo fotograma
+        last = self._last_mask_region
+        if last is not None and last[1] is None:
+            return last[0]
+        
+        # Sin máscara, o calculada solo en la región de seguimiento
+        full = np.zeros((h // self.downscale, w // self.downscale), dtype=np.uint8)
+        if last is not None:
+            mask, (x1, y1, x2, y2) = last
+            full[y1:y2, x1:x2] = mask
+        return full
+    
     def release(self):
         """Libera recursos."""
         pass
+
+
+class HandTrackerCUDA(HandTrackerOpenCV):
+    """
+    Variante de HandTrackerOpenCV que calcula la máscara en GPU (CUDA).
+    
+    Sube el fotograma reducido una vez, encadena HSV, umbral de piel,
+    máscara de búsqueda y morfología en la GPU y solo descarga la máscara
+    final para findContours. Requiere OpenCV compilado con CUDA; conviene
+    medir en el equipo de destino, no siempre es más rápido que la CPU.
+    """
+    
+    def __init__(self):
+        """Inicializa el rastreador y los filtros de GPU."""
+        if not cuda_available():
+            raise RuntimeError("No hay dispositivos CUDA disponibles")
+        
+        super().__init__()
+        
+        self._g_frame = cv2.cuda_GpuMat()
+        self._g_search = cv2.cuda_GpuMat()
+        self._g_search_key = None
+        self._close_filter = cv2.cuda.createMorphologyFilter(
+            cv2.MORPH_CLOSE, cv2.CV_8UC1, self.kernel)
+        self._open_filter = cv2.cuda.createMorphologyFilter(
+            cv2.MORPH_OPEN, cv2.CV_8UC1, self.kernel)
+    
+    def _compute_mask(self, small: np.ndarray, redetect: bool,
+                      region: Optional[Tuple[int, int, int, int]] = None) -> np.ndarray:
+        """Calcula la máscara de la mano en GPU."""
+        if redetect:
+            self._detect_faces(cv2.cvtColor(small, cv2.COLOR_BGR2GRAY))
+        
+        # Máscara de búsqueda: solo se sube cuando cambia (o la región)
+        search_mask = self._get_search_mask(small.shape[:2])
+        search_key = (self._mask_shape, self._mask_face_version, region)
+        if region is not None:
+            x1, y1, x2, y2 = region
+            small = small[y1:y2, x1:x2]
+            search_mask = np.ascontiguousarray(search_mask[y1:y2, x1:x2])
+        if self._g_search_key != search_key:
+            self._g_search.upload(search_mask)
+            self._g_search_key = search_key
+        
+        self._g_frame.upload(small)
+        g_hsv = cv2.cuda.cvtColor(self._g_frame, cv2.COLOR_BGR2HSV)
+        lower, upper = self.skin_range
+        g_skin = cv2.cuda.inRange(g_hsv, lower, upper)
+        g_skin = cv2.cuda.bitwise_and(g_skin, self._g_search)
+        
+        # Morfología
+        g_skin = self._close_filter.apply(g_skin)
+        g_skin = self._open_filter.apply(g_skin)
+        
+        return g_skin.download()
+
+
+def cuda_available() -> bool:
+    """Indica si OpenCV tiene soporte CUDA y hay al menos un dispositivo."""
+    try:
+        return cv2.cuda.getCudaEnabledDeviceCount() > 0
+    except (AttributeError, cv2.error):
+        # OpenCV sin el módulo cuda
+        return False
+
+
+def create_hand_tracker(use_opencl: bool = False) -> HandTrackerOpenCV:
+    """
+    Crea el rastreador más rápido disponible en este equipo.
+    
+    Usa HandTrackerCUDA si hay un dispositivo CUDA y, si no (o si falla
+    al inicializarse), HandTrackerOpenCV.
+    
+    Args:
+        use_opencl: Pasado a HandTrackerOpenCV cuando no se usa CUDA
+        
+    Returns:
+        Rastreador de manos
+    """
+    if cuda_available():
+        try:
+            return HandTrackerCUDA()
+        except (RuntimeError, cv2.error) as e:
+            print(f"CUDA no disponible ({e}); se usa la CPU")
+    return HandTrackerOpenCV(use_opencl=use_opencl)
@@ -10,62 +10,54 @@ Universidad: Universidad de La Laguna
 
 import cv2
 import numpy as np
-from hand_tracker_opencv import HandTrackerOpenCV
-from physics_world import PhysicsWorld
-from utils import mediapipe_to_pymunk, clamp, smooth_value
+from typing import Tuple, Optional
+from hand_tracker_opencv import create_hand_tracker
+from game_base import BaseGestureGame
 
 
-class GestureBalanceGame:
+KEY_MASK = ord('m')
+
+
+class GestureBalanceGame(BaseGestureGame):
     """
     Clase principal del juego.
     
     Integra detección de manos y física.
     """
     
-    def __init__(self, width: int = 800, height: int = 600):
+    position_smoothing = 0.2
+    angle_smoothing = 0.15
+    platform_margin = 70
+    platform_width = 120
+    hud_origin = (20, 35)
+    read_error_message = "Error al leer fotograma."
+    interrupt_message = "\nJuego interrumpido."
+    mask_window_name = "Máscara de Detección"
+    
+    def __init__(self, width: int = 800, height: int = 600, use_opencl: bool = False):
         """
         Inicializa el juego.
         
         Args:
             width: Ancho de la ventana
             height: Alto de la ventana
+            use_opencl: Procesar la máscara de piel en la GPU mediante
+                OpenCL (cv2.UMat) si el equipo lo soporta
         """
-        self.width = width
-        self.height = height
-        self.running = True
-        
-        # Inicializar componentes
-        self.hand_tracker = HandTrackerOpenCV()
-        self.physics_world = PhysicsWorld(width, height)
-        
-        # Variables de suavizado
-        self.smoothed_x = width / 2
-        self.smoothed_y = height / 2
-        self.smoothed_angle = 0
-        
-        # FPS
-        self.clock = cv2.getTickCount()
-        self.fps = 0
-        self.frame_count = 0
-        
-        # Estado
-        self.paused = False
-        self.show_landmarks = True
-        
-    def run(self):
-        """Ejecuta el bucle principal del juego."""
-        # Abrir cámara
-        cap = cv2.VideoCapture(0)
-        
-        if not cap.isOpened():
-            print("Error: No se pudo acceder a la cámara.")
-            return
+        # Rastreador en GPU (CUDA) si la hay; si no, en CPU u OpenCL
+        super().__init__(create_hand_tracker(use_opencl=use_opencl), width, height)
         
-        # Configurar cámara
-        cap.set(cv2.CAP_PROP_FRAME_WIDTH, self.width)
-        cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self.height)
+        self.show_mask = False
+        self._skin_trackbars_ready = False
+        self._shadow_i32 = np.empty((4, 2), dtype=np.int32)
+    
+    def _configure_camera(self, cap: cv2.VideoCapture):
+        """Configura resolución y FPS de la cámara."""
+        super()._configure_camera(cap)
         cap.set(cv2.CAP_PROP_FPS, 30)
-        
+    
+    def _print_controls(self):
+        """Muestra los controles por consola."""
         print("=" * 60)
         print("PLATAFORMA DE EQUILIBRIO - CONTROL POR GESTOS")
         print("=" * 60)
@@ -73,128 +65,98 @@ class GestureBalanceGame:
         print("  - Mueve tu MANO DERECHA para controlar la plataforma")
         print("  - Rota tu mano para inclinar la plataforma")
         print("  - Presiona 'L' para mostrar/ocultar landmarks")
+        print("  - Presiona 'M' para mostrar/ocultar la máscara de detección")
+        print("    (con barras para ajustar el rango HSV de la piel)")
         print("  - Presiona 'P' para pausar/reanudar")
         print("  - Presiona 'R' para reiniciar")
         print("  - Presiona 'Q' para salir")
         print("\n¡La cara NO será detectada!")
         print("=" * 60)
+    
+    def _show(self, frame: np.ndarray):
+        """Muestra el juego y, si está activa, la máscara de detección."""
+        super()._show(frame)
+        if self.show_mask:
+            cv2.imshow(self.mask_window_name, self.hand_tracker.draw_hand_mask(frame))
+    
+    def _handle_key(self, key: int):
+        """Tecla 'M': mostrar/ocultar la máscara de detección."""
+        if key == KEY_MASK:
+            self.show_mask = not self.show_mask
+            if self.show_mask:
+                self._create_mask_window()
+            else:
+                cv2.destroyWindow(self.mask_window_name)
+    
+    def _create_mask_window(self):
+        """
+        Crea la ventana de la máscara con barras para ajustar el rango HSV.
         
-        try:
-            while self.running:
-                ret, frame = cap.read()
-                
-                if not ret:
-                    print("Error al leer fotograma.")
-                    break
-                
-                # Espejo
-                frame = cv2.flip(frame, 1)
-                
-                # Detectar mano
-                landmarks, angle, position = self.hand_tracker.detect_hand(frame)
-                
-                # Actualizar si se detectó mano
-                if landmarks is not None and position is not None and angle is not None:
-                    # Convertir coordenadas
-                    pymunk_x, pymunk_y = mediapipe_to_pymunk(
-                        position[0], position[1],
-                        self.width, self.height,
-                        self.width, self.height
-                    )
-                    
-                    # Suavizar
-                    self.smoothed_x = smooth_value(self.smoothed_x, pymunk_x, 0.2)
-                    self.smoothed_y = smooth_value(self.smoothed_y, pymunk_y, 0.2)
-                    self.smoothed_angle = smooth_value(self.smoothed_angle, angle, 0.15)
-                    
-                    # Limitar
-                    self.smoothed_x = clamp(self.smoothed_x, 70, self.width - 70)
-                    self.smoothed_y = clamp(self.smoothed_y, 70, self.height - 70)
-                    
-                    # Actualizar plataforma
-                    if not self.paused:
-                        self.physics_world.update_platform(
-                            (self.smoothed_x, self.smoothed_y),
-                            self.smoothed_angle
-                        )
-                    
-                    # Dibujar landmarks
-                    if self.show_landmarks:
-                        frame = self.hand_tracker.draw_landmarks(frame, landmarks)
-                
-                # Actualizar física
-                if not self.paused:
-                    self.physics_world.update()
-                
-                # Renderizar
-                frame = self._render_scene(frame)
-                
-                # Calcular FPS
-                self.frame_count += 1
-                if self.frame_count % 10 == 0:
-                    elapsed = (cv2.getTickCount() - self.clock) / cv2.getTickFrequency()
-                    self.fps = 10 / elapsed
-                    self.clock = cv2.getTickCount()
-                
-                # Dibujar UI
-                self._draw_ui(frame)
-                
-                # Mostrar
-                cv2.imshow("Plataforma de Equilibrio - Control por Gestos", frame)
-                
-                # Procesar teclas
-                key = cv2.waitKey(1) & 0xFF
-                if key == ord('q'):
-                    self.running = False
-                elif key == ord('l'):
-                    self.show_landmarks = not self.show_landmarks
-                elif key == ord('p'):
-                    self.paused = not self.paused
-                elif key == ord('r'):
-                    self.physics_world.reset()
-        
-        except KeyboardInterrupt:
-            print("\nJuego interrumpido.")
+        Las barras no bloquean el juego: cada cambio llama a
+        adjust_skin_range y se aplica en el siguiente fotograma.
+        """
+        self._skin_trackbars_ready = False
+        cv2.namedWindow(self.mask_window_name)
+        
+        lower, upper = self.hand_tracker.skin_range
+        for name, value, max_value in self._skin_trackbars(lower, upper):
+            cv2.createTrackbar(name, self.mask_window_name, value, max_value,
+                               self._on_skin_change)
+        self._skin_trackbars_ready = True
+    
+    def _skin_trackbars(self, lower: tuple, upper: tuple) -> list:
+        """Devuelve (nombre, valor, máximo) de cada barra del rango HSV."""
+        return [
+            ("H min", lower[0], 180), ("H max", upper[0], 180),
+            ("S min", lower[1], 255), ("S max", upper[1], 255),
+            ("V min", lower[2], 255), ("V max", upper[2], 255)
+        ]
+    
+    def _on_skin_change(self, _value: int):
+        """Aplica al rastreador los valores actuales de las barras HSV."""
+        if not self._skin_trackbars_ready:
+            return
         
-        finally:
-            cap.release()
-            self.hand_tracker.release()
-            cv2.destroyAllWindows()
-            print("Juego finalizado.")
+        h_lo, h_hi, s_lo, s_hi, v_lo, v_hi = (
+            cv2.getTrackbarPos(name, self.mask_window_name)
+            for name in ("H min", "H max", "S min", "S max", "V min", "V max")
+        )
+        self.hand_tracker.adjust_skin_range((h_lo, s_lo, v_lo), (h_hi, s_hi, v_hi))
     
-    def _draw_ui(self, frame: np.ndarray):
-        """Dibuja la interfaz de usuario."""
-        # Panel de información
-        overlay = frame.copy()
-        cv2.rectangle(overlay, (10, 10), (300, 100), (0, 0, 0), -1)
-        cv2.addWeighted(overlay, 0.5, frame, 0.5, 0, frame)
+    def _build_hud(self):
+        """
+        Prerrenderiza el HUD común, la etiqueta de versión y el aviso de pausa.
         
-        # Textos
-        cv2.putText(frame, f"FPS: {self.fps:.1f}", (20, 35),
-                   cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2)
-        cv2.putText(frame, f"Bolas capturadas: {self.physics_world.balls_caught}", (20, 65),
-                   cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2)
-        cv2.putText(frame, "OpenCV (Sin MediaPipe)", (20, 90),
-                   cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 0), 1)
+        También prepara el parche del panel semitransparente.
+        """
+        super()._build_hud()
+        self._hud_rois.append(self._stamp_text("OpenCV (Sin MediaPipe)", (20, 90), 0.5, (255, 255, 0), 1))
+        self._pause_rois.append(
+            self._stamp_text("PAUSADO", (self.width // 2 - 100, self.height // 2), 1.5, (0, 0, 255), 3)
+        )
+        
+        # Panel semitransparente detrás de los textos
+        self._panel_tint = self._make_tint((10, 10), (300, 100), (0, 0, 0), 0.5)
+    
+    def _build_static_layer(self, shape: Optional[Tuple[int, int]] = None):
+        """Prepara la capa estática y el fondo fijo de la zona de captura."""
+        super()._build_static_layer(shape)
         
-        # Pausado
-        if self.paused:
-            cv2.putText(frame, "PAUSADO", (self.width // 2 - 100, self.height // 2),
-                       cv2.FONT_HERSHEY_SIMPLEX, 1.5, (0, 0, 255), 3)
+        bucket_x, bucket_y, bucket_w, bucket_h = self.physics_world.get_bucket_rect()
+        self._bucket_tint = self._make_tint(
+            (int(bucket_x), int(bucket_y)),
+            (int(bucket_x + bucket_w), int(bucket_y + bucket_h)),
+            (255, 100, 0), 0.3
+        )
+    
+    def _draw_bucket_fill(self, frame: np.ndarray):
+        """Dibuja el fondo semitransparente de la zona de captura."""
+        self._blit_tint(frame, self._bucket_tint)
     
-    def _render_scene(self, frame: np.ndarray) -> np.ndarray:
-        """Renderiza los objetos de física."""
-        # Zona de captura
+    def _draw_bucket(self, frame: np.ndarray):
+        """Dibuja el borde y el texto de la zona de captura."""
         bucket_x, bucket_y, bucket_w, bucket_h = self.physics_world.get_bucket_rect()
         
-        # Fondo de zona
-        overlay = frame.copy()
-        cv2.rectangle(overlay,
-                     (int(bucket_x), int(bucket_y)),
-                     (int(bucket_x + bucket_w), int(bucket_y + bucket_h)),
-                     (255, 100, 0), -1)
-        cv2.addWeighted(overlay, 0.3, frame, 0.7, 0, frame)
-        
         # Borde de zona
         cv2.rectangle(frame,
                      (int(bucket_x), int(bucket_y)),
@@ -204,60 +166,21 @@ class GestureBalanceGame:
         # Texto de zona
         cv2.putText(frame, "ZONA CAPTURA", (int(bucket_x + 30), int(bucket_y + 40)),
                    cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2)
-        
-        # Dibujar plataforma
-        self._draw_platform(frame)
-        
-        # Dibujar bolas
-        for body, shape in self.physics_world.get_balls():
-            self._draw_ball(frame, body, shape)
-        
-        # Dibujar paredes
-        self._draw_walls(frame)
-        
-        return frame
     
-    def _draw_platform(self, frame: np.ndarray):
+    def _draw_platform(self, frame: np.ndarray, x: float, y: float, angle: float):
         """Dibuja la plataforma."""
-        body = self.physics_world.platform_body
-        if body is None:
-            return
-        
-        x, y = body.position
-        angle = body.angle
-        width, height = 120, 15
-        
-        # Calcular vértices
-        corners = np.array([
-            [-width/2, -height/2],
-            [width/2, -height/2],
-            [width/2, height/2],
-            [-width/2, height/2]
-        ])
-        
-        # Rotar
-        cos_a = np.cos(angle)
-        sin_a = np.sin(angle)
-        rotation = np.array([[cos_a, -sin_a], [sin_a, cos_a]])
-        corners = corners @ rotation.T
-        
-        # Trasladar
-        corners = corners + np.array([x, y])
-        corners = corners.astype(int)
+        corners = self._platform_polygon(x, y, angle)
         
         # Sombra
-        shadow = corners + np.array([3, 3])
-        cv2.fillPoly(frame, [shadow], (50, 50, 50))
+        shadow = np.add(corners, 3, out=self._shadow_i32)
+        cv2.fillConvexPoly(frame, shadow, (50, 50, 50))
         
         # Plataforma
-        cv2.fillPoly(frame, [corners], (0, 200, 255))
+        cv2.fillConvexPoly(frame, corners, (0, 200, 255))
         cv2.polylines(frame, [corners], True, (0, 255, 255), 3)
     
-    def _draw_ball(self, frame: np.ndarray, body, shape):
+    def _draw_ball(self, frame: np.ndarray, x: int, y: int, radius: int):
         """Dibuja una bola."""
-        x, y = int(body.position.x), int(body.position.y)
-        radius = int(shape.radius)
-        
         # Sombra
         cv2.circle(frame, (x + 2, y + 2), radius, (50, 50, 50), -1)
         
@@ -272,9 +195,10 @@ class GestureBalanceGame:
     
     def _draw_walls(self, frame: np.ndarray):
         """Dibuja las paredes."""
-        cv2.line(frame, (0, 0), (0, self.height), (200, 200, 200), 4)
-        cv2.line(frame, (self.width-1, 0), (self.width-1, self.height), (200, 200, 200), 4)
-        cv2.line(frame, (0, 0), (self.width, 0), (200, 200, 200), 4)
+        height, width = frame.shape[:2]
+        cv2.line(frame, (0, 0), (0, height), (200, 200, 200), 4)
+        cv2.line(frame, (width-1, 0), (width-1, height), (200, 200, 200), 4)
+        cv2.line(frame, (0, 0), (width, 0), (200, 200, 200), 4)
 
 
 def main():
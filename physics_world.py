@@ -9,10 +9,94 @@ Este módulo proporciona la clase PhysicsWorld que gestiona:
 - Simulación de gravedad, colisiones y fricción
 """
 
+from __future__ import annotations
+
+import time
 import pymunk
+from pymunk import Vec2d
 import numpy as np
-from typing import List, Tuple, Optional
-import random
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+from utils import njit, normalize_angle
+
+if TYPE_CHECKING:
+    # Solo para las anotaciones (se evalúan de forma diferida)
+    from typing import List, Tuple, Optional
+
+
+# Códigos de clasificación de las bolas
+BALL_KEEP = 0
+BALL_FALLEN = 1
+BALL_CAUGHT = 2
+
+# Hasta este número de bolas, un bucle de Python clasifica más rápido que
+# la llamada al bucle compilado (medido: 1.6 frente a 3.2 us con 5 bolas;
+# se igualan hacia las 16-20)
+SCALAR_CLASSIFY_MAX_BALLS = 16
+
+
+@njit(cache=True)
+def _classify_balls(xy, vy, n, x_min, x_max, y_min, y_max, y_fall, v_cap, out):
+    """
+    Clasifica cada bola en una sola pasada sobre los arrays SoA.
+    
+    Args:
+        xy: Posiciones de las bolas (N, 2)
+        vy: Velocidades verticales (N,)
+        n: Número de bolas activas
+        x_min: Límite izquierdo de la zona
+        x_max: Límite derecho de la zona
+        y_min: Límite inferior de la zona
+        y_max: Límite superior de la zona
+        y_fall: Altura por debajo de la cual la bola se da por caída
+        v_cap: Velocidad vertical máxima (en valor absoluto) para capturar
+        out: Códigos de salida uint8 (N,): BALL_KEEP, BALL_FALLEN o BALL_CAUGHT
+    """
+    for i in range(n):
+        x = xy[i, 0]
+        y = xy[i, 1]
+        if y < y_fall:
+            out[i] = BALL_FALLEN
+        elif x_min <= x <= x_max and y_min <= y <= y_max and abs(vy[i]) < v_cap:
+            out[i] = BALL_CAUGHT
+        else:
+            out[i] = BALL_KEEP
+
+
+@dataclass(frozen=True)
+class PhysicsConfig:
+    """
+    Parámetros del mundo de física.
+    
+    Attributes:
+        gravity: Gravedad vertical (px/s²)
+        elasticity: Elasticidad de paredes y bolas
+        friction: Fricción de paredes y bolas
+        max_balls: Número máximo de bolas simultáneas
+        spawn_interval: Segundos de simulación entre generaciones
+        ball_radius: Radio de las bolas
+        ball_mass: Masa de las bolas
+        bucket_x_range: Límites horizontales de la zona de captura, como
+            fracción del ancho del mundo
+        bucket_y_range: Límites verticales de la zona de captura (px)
+        fall_y: Altura por debajo de la cual una bola se da por caída
+        capture_max_vy: Velocidad vertical máxima (en valor absoluto)
+            para capturar una bola
+        platform_max_interval: Tiempo máximo (s) en que la plataforma
+            recorre el camino hasta un objetivo nuevo
+    """
+    gravity: float = 900.0
+    elasticity: float = 0.7
+    friction: float = 0.5
+    max_balls: int = 5
+    spawn_interval: float = 1.0
+    ball_radius: float = 15.0
+    ball_mass: float = 2.0
+    bucket_x_range: Tuple[float, float] = (0.35, 0.65)
+    bucket_y_range: Tuple[float, float] = (20.0, 80.0)
+    fall_y: float = -100.0
+    capture_max_vy: float = 150.0
+    platform_max_interval: float = 0.1
 
 
 class PhysicsWorld:
@@ -27,43 +111,81 @@ class PhysicsWorld:
     - Zona de captura (bucket)
     """
     
-    def __init__(self, width: int = 800, height: int = 600):
+    def __init__(self, width: int = 800, height: int = 600, seed: Optional[int] = None,
+                 config: Optional[PhysicsConfig] = None):
         """
         Inicializa el mundo de física.
         
         Args:
             width: Ancho del mundo de física
             height: Alto del mundo de física
+            seed: Semilla del generador aleatorio de las bolas (None: aleatoria)
+            config: Parámetros del mundo (None: PhysicsConfig por defecto)
         """
         self.width = width
         self.height = height
+        self.config = config = config if config is not None else PhysicsConfig()
+        
+        # Zona de captura (parte inferior central), calculada una vez
+        self._bucket_x_min = width * config.bucket_x_range[0]
+        self._bucket_x_max = width * config.bucket_x_range[1]
+        self._bucket_y_min, self._bucket_y_max = config.bucket_y_range
+        self._fall_y = config.fall_y
+        self._capture_max_vy = config.capture_max_vy
         
         # Crear espacio de física
         self.space = pymunk.Space()
-        self.space.gravity = (0, 900)  # Gravedad hacia abajo
+        self.space.gravity = (0, config.gravity)  # Gravedad hacia abajo
         
         # Propiedades físicas
-        self.elasticity = 0.7
-        self.friction = 0.5
+        self.elasticity = config.elasticity
+        self.friction = config.friction
         
         # Crear paredes
         self._create_walls()
         
-        # Crear plataforma
-        self.platform_body = None
-        self.platform_shape = None
+        # Crear plataforma (platform_body existe siempre a partir de aquí)
+        self._platform_target = None
+        self._platform_target_time = None
+        self._platform_time_left = 0.0
         self._create_platform()
         
-        # Lista de bolas
-        self.balls: List[Tuple[pymunk.Body, pymunk.Circle]] = []
-        self.max_balls = 5
+        # Bolas como listas paralelas de cuerpos y formas
+        self._bodies: List[pymunk.Body] = []
+        self._shapes: List[pymunk.Circle] = []
+        self.max_balls = config.max_balls
+        # Clasificación de las bolas: como nunca hay más de max_balls, el
+        # camino se elige una vez según la configuración
+        if config.max_balls <= SCALAR_CLASSIFY_MAX_BALLS:
+            self._classify = self._classify_scalar
+        else:
+            self._classify = self._classify_compiled
+        
+        # Estado de las bolas en arrays contiguos (SoA): posiciones y radios
+        # para dibujar, velocidad vertical para la captura
+        self._ball_xy = np.empty((self.max_balls, 2), dtype=np.float64)
+        self._ball_vy = np.empty(self.max_balls, dtype=np.float64)
+        self._ball_radii = np.empty(self.max_balls, dtype=np.int32)
+        self._ball_codes = np.empty(self.max_balls, dtype=np.uint8)
         
         # Contador de bolas capturadas
         self.balls_caught = 0
         
-        # Timer para generar bolas
-        self.spawn_timer = 0
-        self.spawn_interval = 60  # Frames entre generaciones
+        # Timer para generar bolas (en segundos de simulación)
+        self.spawn_timer = 0.0
+        self.spawn_interval = config.spawn_interval  # Segundos entre generaciones
+        
+        # Pool de bolas: se crean una vez y se reciclan al retirarlas
+        self._free_balls: List[Tuple[pymunk.Body, pymunk.Circle]] = [
+            self._new_ball() for _ in range(self.max_balls)
+        ]
+        
+        # Parámetros aleatorios de generación, sorteados por lotes:
+        # columnas (x, vx) uniformes en [0, 1)
+        self._rng = np.random.default_rng(seed)
+        self._spawn_batch = 128
+        self._spawn_buf = self._rng.random((self._spawn_batch, 2))
+        self._spawn_idx = 0
         
     def _create_walls(self):
         """Crea las paredes estáticas del mundo."""
@@ -79,7 +201,7 @@ class PhysicsWorld:
         for wall in walls:
             wall.elasticity = self.elasticity
             wall.friction = self.friction
-            self.space.add(wall)
+        self.space.add(*walls)
     
     def _create_platform(self):
         """Crea la plataforma controlada por el usuario."""
@@ -107,63 +229,103 @@ class PhysicsWorld:
     
     def update_platform(self, position: Tuple[float, float], angle: float):
         """
-        Actualiza la posición y rotación de la plataforma.
+        Fija la posición y rotación objetivo de la plataforma.
+        
+        Los objetivos llegan al ritmo de la cámara, más lento que el de la
+        física: la plataforma recorre el camino a velocidad constante
+        durante el intervalo medido desde el objetivo anterior (como mucho
+        platform_max_interval), en lugar de saltar en un solo paso. El
+        primer objetivo se alcanza en el siguiente update().
         
         Args:
             position: Tupla (x, y) de la nueva posición
             angle: Ángulo de rotación en radianes
         """
-        if self.platform_body is None:
+        now = time.perf_counter()
+        if self._platform_target_time is None:
+            interval = 0.0
+        else:
+            interval = min(now - self._platform_target_time,
+                           self.config.platform_max_interval)
+        self._platform_target_time = now
+        self._platform_time_left = interval
+        self._platform_target = (Vec2d(*position), angle)
+    
+    def _drive_platform(self, dt: float):
+        """
+        Ajusta la velocidad de la plataforma para llegar al objetivo a tiempo.
+        
+        Reparte lo que falta entre el tiempo que queda del intervalo (al
+        menos un paso), así llega justo al final sin pasarse y después se
+        queda quieta. Las colisiones usan la velocidad real sea cual sea dt.
+        """
+        if self._platform_target is None:
             return
         
-        # Calcular velocidad para colisiones realistas
-        old_pos = self.platform_body.position
-        dt = 1/60
-        velocity = (
-            (position[0] - old_pos[0]) / dt,
-            (position[1] - old_pos[1]) / dt
-        )
+        target, target_angle = self._platform_target
+        remaining = max(self._platform_time_left, dt)
+        self._platform_time_left = remaining - dt
+        inv_t = 1.0 / remaining
+        body = self.platform_body
+        body.velocity = (target - body.position) * inv_t
+        body.angular_velocity = normalize_angle(target_angle - body.angle) * inv_t
+    
+    @property
+    def balls(self) -> List[Tuple[pymunk.Body, pymunk.Circle]]:
+        """Lista de tuplas (body, shape) de las bolas activas (copia)."""
+        return list(zip(self._bodies, self._shapes))
+    
+    def _new_ball(self) -> Tuple[pymunk.Body, pymunk.Circle]:
+        """Crea el cuerpo dinámico y la forma circular de una bola, sin añadirlos al espacio."""
+        radius = self.config.ball_radius
+        mass = self.config.ball_mass
+        moment = pymunk.moment_for_circle(mass, 0, radius)
+        body = pymunk.Body(mass, moment)
         
-        self.platform_body.position = position
-        self.platform_body.angle = angle
-        self.platform_body.velocity = velocity
+        shape = pymunk.Circle(body, radius)
+        shape.elasticity = self.elasticity
+        shape.friction = self.friction
+        return body, shape
     
-    def spawn_ball(self) -> Optional[Tuple[pymunk.Body, pymunk.Circle]]:
+    def spawn_ball(self) -> Optional[int]:
         """
         Genera una nueva bola en la parte superior.
         
         Returns:
-            Tupla (body, shape) de la bola creada o None
+            Índice de la bola creada o None
         """
-        if len(self.balls) >= self.max_balls:
+        if len(self._bodies) >= self.max_balls:
             return None
         
+        # Parámetros aleatorios del lote (se repone al agotarse)
+        if self._spawn_idx >= self._spawn_batch:
+            self._rng.random(out=self._spawn_buf)
+            self._spawn_idx = 0
+        rand_x, rand_vx = self._spawn_buf[self._spawn_idx].tolist()
+        self._spawn_idx += 1
+        
         # Posición aleatoria en la parte superior
-        x = random.uniform(100, self.width - 100)
+        x = 100 + rand_x * (self.width - 200)
         y = self.height - 50
         
-        # Radio
-        radius = 15
-        
-        # Crear cuerpo dinámico
-        mass = 2.0
-        moment = pymunk.moment_for_circle(mass, 0, radius)
-        body = pymunk.Body(mass, moment)
+        # Bola del pool (fuera del espacio) con el estado de una recién creada
+        if self._free_balls:
+            body, shape = self._free_balls.pop()
+        else:
+            body, shape = self._new_ball()
         body.position = (x, y)
+        body.angle = 0.0
+        body.angular_velocity = 0.0
         
         # Velocidad inicial pequeña
-        body.velocity = (random.uniform(-50, 50), 0)
-        
-        # Crear forma circular
-        shape = pymunk.Circle(body, radius)
-        shape.elasticity = 0.7
-        shape.friction = 0.5
+        body.velocity = (rand_vx * 100 - 50, 0)
         
         # Agregar al espacio
         self.space.add(body, shape)
-        self.balls.append((body, shape))
+        self._bodies.append(body)
+        self._shapes.append(shape)
         
-        return (body, shape)
+        return len(self._bodies) - 1
     
     def update(self, dt: float = 1/60):
         """
@@ -173,89 +335,157 @@ class PhysicsWorld:
             dt: Delta de tiempo
         """
         # Actualizar física
+        self._drive_platform(dt)
         self.space.step(dt)
         
         # Generar bolas
-        self.spawn_timer += 1
+        self.spawn_timer += dt
         if self.spawn_timer >= self.spawn_interval:
             self.spawn_ball()
-            self.spawn_timer = 0
-        
-        # Remover bolas que cayeron
-        balls_to_remove = []
-        for i, (body, shape) in enumerate(self.balls):
-            if body.position.y < -100:
-                balls_to_remove.append(i)
+            self.spawn_timer = 0.0
         
-        for i in sorted(balls_to_remove, reverse=True):
-            body, shape = self.balls[i]
-            self.space.remove(body, shape)
-            self.balls.pop(i)
+        # Volcar el estado de las bolas a los arrays SoA
+        self._sync_ball_arrays()
         
-        # Verificar captura
+        # Retirar las bolas que cayeron o se capturaron
         self._check_caught_balls()
     
-    def _check_caught_balls(self):
-        """Verifica si hay bolas en la zona de captura."""
-        # Zona de captura (parte inferior central)
-        bucket_x_min = self.width * 0.35
-        bucket_x_max = self.width * 0.65
-        bucket_y_min = 20
-        bucket_y_max = 80
-        
-        caught = []
-        for i, (body, shape) in enumerate(self.balls):
+    def _sync_ball_arrays(self):
+        """Copia posición, velocidad vertical y radio de cada bola a los arrays SoA."""
+        n = len(self._bodies)
+        if n > len(self._ball_radii):
+            self._ball_xy = np.empty((n, 2), dtype=np.float64)
+            self._ball_vy = np.empty(n, dtype=np.float64)
+            self._ball_radii = np.empty(n, dtype=np.int32)
+            self._ball_codes = np.empty(n, dtype=np.uint8)
+        
+        xy = self._ball_xy
+        vy = self._ball_vy
+        for i, body in enumerate(self._bodies):
             x, y = body.position
-            if (bucket_x_min <= x <= bucket_x_max and 
-                bucket_y_min <= y <= bucket_y_max):
-                # Verificar que esté relativamente quieta
-                if abs(body.velocity.y) < 150:
-                    caught.append(i)
-        
-        # Remover bolas capturadas
-        for i in sorted(caught, reverse=True):
-            body, shape = self.balls[i]
-            self.space.remove(body, shape)
-            self.balls.pop(i)
-            self.balls_caught += 1
+            xy[i, 0] = x
+            xy[i, 1] = y
+            vy[i] = body.velocity.y
+        # La asignación trunca a entero como int()
+        self._ball_radii[:n] = [shape.radius for shape in self._shapes]
+    
+    def _check_caught_balls(self):
+        """
+        Retira las bolas capturadas y las que cayeron fuera del mundo.
+        
+        Clasifica las bolas sobre los arrays SoA (caída y captura a la vez;
+        con pocas bolas en un bucle de Python, con muchas en uno compilado
+        con Numba si está disponible) y recorre en Python solo las que hay
+        que retirar. Los arrays se compactan para
+        que get_balls siga devolviendo solo las bolas activas.
+        """
+        n = len(self._bodies)
+        if n == 0:
+            return
+        
+        removed, n_caught = self._classify(n)
+        if len(removed) == 0:
+            return
+        
+        # Una sola llamada a Pymunk para todos los cuerpos y formas
+        bodies = self._bodies
+        shapes = self._shapes
+        self.space.remove(*[bodies[i] for i in removed], *[shapes[i] for i in removed])
+        self._free_balls.extend((bodies[i], shapes[i]) for i in removed)
+        self.balls_caught += n_caught
+        
+        # Conservar el resto, en el mismo orden, en la lista y en los arrays
+        keep = np.ones(n, dtype=np.bool_)
+        keep[removed] = False
+        kept = keep.tolist()
+        self._bodies = [body for body, k in zip(bodies, kept) if k]
+        self._shapes = [shape for shape, k in zip(shapes, kept) if k]
+        m = len(self._bodies)
+        self._ball_xy[:m] = self._ball_xy[:n][keep]
+        self._ball_vy[:m] = self._ball_vy[:n][keep]
+        self._ball_radii[:m] = self._ball_radii[:n][keep]
+    
+    def _classify_scalar(self, n: int) -> Tuple[List[int], int]:
+        """
+        Clasifica pocas bolas con un bucle de Python sobre los arrays SoA.
+        
+        Returns:
+            Tupla (índices a retirar, número de bolas capturadas)
+        """
+        x_min, x_max = self._bucket_x_min, self._bucket_x_max
+        y_min, y_max = self._bucket_y_min, self._bucket_y_max
+        y_fall, v_cap = self._fall_y, self._capture_max_vy
+        removed = []
+        n_caught = 0
+        for i, ((x, y), vy) in enumerate(zip(self._ball_xy[:n].tolist(),
+                                             self._ball_vy[:n].tolist())):
+            if y < y_fall:
+                removed.append(i)
+            elif x_min <= x <= x_max and y_min <= y <= y_max and abs(vy) < v_cap:
+                removed.append(i)
+                n_caught += 1
+        return removed, n_caught
+    
+    def _classify_compiled(self, n: int) -> Tuple[np.ndarray, int]:
+        """
+        Clasifica muchas bolas con el bucle compilado _classify_balls.
+        
+        Returns:
+            Tupla (índices a retirar, número de bolas capturadas)
+        """
+        # Caída, zona y velocidad en un único bucle compilado
+        _classify_balls(self._ball_xy, self._ball_vy, n,
+                        self._bucket_x_min, self._bucket_x_max,
+                        self._bucket_y_min, self._bucket_y_max,
+                        self._fall_y, self._capture_max_vy, self._ball_codes)
+        codes = self._ball_codes[:n]
+        return np.flatnonzero(codes), int(np.count_nonzero(codes == BALL_CAUGHT))
     
     def get_platform_position(self) -> Tuple[float, float]:
         """Retorna la posición de la plataforma."""
-        if self.platform_body is None:
-            return (0, 0)
         return self.platform_body.position
     
     def get_platform_angle(self) -> float:
         """Retorna el ángulo de la plataforma."""
-        if self.platform_body is None:
-            return 0
         return self.platform_body.angle
     
-    def get_balls(self) -> List[Tuple[pymunk.Body, pymunk.Circle]]:
-        """Retorna la lista de bolas activas."""
-        return self.balls
+    def get_balls(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Retorna las bolas activas en formato SoA.
+        
+        Los arrays se actualizan en update() y se reutilizan entre
+        llamadas; no deben modificarse.
+        
+        Returns:
+            Tupla (xy, radii): posiciones (N, 2) y radios enteros (N,)
+        """
+        n = len(self._bodies)
+        return self._ball_xy[:n], self._ball_radii[:n]
     
     def get_bucket_rect(self) -> Tuple[float, float, float, float]:
         """Retorna el rectángulo de la zona de captura (x, y, w, h)."""
-        x_min = self.width * 0.35
-        x_max = self.width * 0.65
-        y_min = 20
-        y_max = 80
-        return (x_min, y_min, x_max - x_min, y_max - y_min)
+        return (self._bucket_x_min, self._bucket_y_min,
+                self._bucket_x_max - self._bucket_x_min,
+                self._bucket_y_max - self._bucket_y_min)
     
     def reset(self):
         """Reinicia el mundo de física."""
-        # Remover todas las bolas
-        for body, shape in self.balls:
-            self.space.remove(body, shape)
-        self.balls.clear()
+        # Remover todas las bolas (en una sola llamada)
+        if self._bodies:
+            self.space.remove(*self._bodies, *self._shapes)
+            self._free_balls.extend(zip(self._bodies, self._shapes))
+        self._bodies.clear()
+        self._shapes.clear()
         
         # Reiniciar contadores
         self.balls_caught = 0
-        self.spawn_timer = 0
+        self.spawn_timer = 0.0
         
         # Reiniciar plataforma
-        if self.platform_body is not None:
-            self.platform_body.position = (self.width / 2, self.height / 2)
-            self.platform_body.angle = 0
-            self.platform_body.velocity = (0, 0)
+        self._platform_target = None
+        self._platform_target_time = None
+        self._platform_time_left = 0.0
+        self.platform_body.position = (self.width / 2, self.height / 2)
+        self.platform_body.angle = 0
+        self.platform_body.velocity = (0, 0)
+        self.platform_body.angular_velocity = 0
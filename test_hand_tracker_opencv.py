@@ -0,0 +1,100 @@
+"""
+Pruebas del rastreador de manos con OpenCV.
+
+Comprueban que el kernel de la máscara de piel no bloquea la salida del
+proceso y que create_hand_tracker recurre a la CPU si no hay CUDA.
+
+Ejecutar con: python -m unittest test_hand_tracker_opencv (o pytest)
+"""
+
+import os
+import subprocess
+import sys
+import unittest
+from unittest import mock
+import cv2
+from utils import NUMBA_AVAILABLE
+from hand_tracker_opencv import (HandTrackerOpenCV, HandTrackerCUDA,
+                                 create_hand_tracker)
+
+
+# Llama al kernel de la máscara de piel desde un hilo secundario, como el
+# hilo de detección del juego, y termina
+_KERNEL_IN_THREAD = """
+import threading
+import numpy as np
+from hand_tracker_opencv import _skin_mask_fused
+
+def work():
+    small = np.random.default_rng(0).integers(0, 256, (300, 400, 3), dtype=np.uint8)
+    mask = np.empty((300, 400), dtype=np.uint8)
+    gray = np.empty((300, 400), dtype=np.uint8)
+    _skin_mask_fused(small, np.empty((0, 4), dtype=np.int32), 200,
+                     (0, 20, 70), (20, 255, 255), mask, gray, True)
+
+thread = threading.Thread(target=work, daemon=True)
+thread.start()
+thread.join()
+"""
+
+
+class TestSkinMaskKernelThread(unittest.TestCase):
+    """El kernel compilado no debe bloquear la salida del intérprete."""
+    
+    @unittest.skipUnless(NUMBA_AVAILABLE, "Numba no está instalado")
+    def test_process_exits_after_kernel_in_thread(self):
+        env = dict(os.environ)
+        # La capa de hilos por defecto de Numba (TBB si está instalada)
+        env.pop("NUMBA_THREADING_LAYER", None)
+        try:
+            result = subprocess.run([sys.executable, "-c", _KERNEL_IN_THREAD],
+                                    cwd=os.path.dirname(os.path.abspath(__file__)),
+                                    env=env, capture_output=True, timeout=120)
+        except subprocess.TimeoutExpired:
+            self.fail("El proceso no terminó tras usar el kernel desde un hilo")
+        self.assertEqual(result.returncode, 0, result.stderr.decode(errors="replace"))
+
+
+class TestCreateHandTracker(unittest.TestCase):
+    """Selección del rastreador según haya o no CUDA."""
+    
+    def test_cpu_without_cuda_device(self):
+        with mock.patch.object(cv2.cuda, "getCudaEnabledDeviceCount", return_value=0):
+            tracker = create_hand_tracker()
+        self.assertIs(type(tracker), HandTrackerOpenCV)
+        self.assertFalse(tracker.use_opencl)
+    
+    def test_cpu_without_cuda_module(self):
+        with mock.patch.object(cv2, "cuda", None):
+            tracker = create_hand_tracker()
+        self.assertIs(type(tracker), HandTrackerOpenCV)
+    
+    def test_cpu_when_cuda_init_fails(self):
+        # Hay dispositivo, pero este OpenCV no trae los filtros de CUDA
+        with mock.patch.object(cv2.cuda, "getCudaEnabledDeviceCount", return_value=1), \
+                mock.patch.object(HandTrackerCUDA, "__init__",
+                                  side_effect=cv2.error("sin CUDA")), \
+                mock.patch("builtins.print"):
+            tracker = create_hand_tracker()
+        self.assertIs(type(tracker), HandTrackerOpenCV)
+    
+    def test_cuda_with_device(self):
+        with mock.patch.object(cv2.cuda, "getCudaEnabledDeviceCount", return_value=1), \
+                mock.patch.object(HandTrackerCUDA, "__init__", return_value=None):
+            tracker = create_hand_tracker()
+        self.assertIs(type(tracker), HandTrackerCUDA)
+    
+    def test_opencl_off_by_default(self):
+        with mock.patch.object(cv2.ocl, "setUseOpenCL") as set_use:
+            tracker = create_hand_tracker()
+        self.assertFalse(tracker.use_opencl)
+        set_use.assert_not_called()
+    
+    def test_cuda_tracker_refuses_without_device(self):
+        with mock.patch.object(cv2.cuda, "getCudaEnabledDeviceCount", return_value=0):
+            with self.assertRaises(RuntimeError):
+                HandTrackerCUDA()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,201 @@
+"""
+Pruebas de la clasificación de bolas de PhysicsWorld.
+
+Comprueban que el bucle compilado _classify_balls da el mismo resultado
+que su versión en Python y que una referencia con máscaras de NumPy, que
+update() retira las bolas caídas y capturadas y que la plataforma recorre
+el camino hasta cada objetivo durante el intervalo entre objetivos.
+
+Ejecutar con: python -m unittest test_physics_world (o pytest)
+"""
+
+import math
+import unittest
+from unittest import mock
+import numpy as np
+from physics_world import (PhysicsWorld, PhysicsConfig, _classify_balls,
+                           BALL_KEEP, BALL_FALLEN, BALL_CAUGHT,
+                           SCALAR_CLASSIFY_MAX_BALLS)
+
+
+def _reference_codes(xy, vy, x_min, x_max, y_min, y_max, y_fall, v_cap):
+    """Clasificación de referencia con máscaras de NumPy."""
+    x, y = xy[:, 0], xy[:, 1]
+    fallen = y < y_fall
+    caught = ~fallen & (x_min <= x) & (x <= x_max) & (y_min <= y) & (y <= y_max) & (np.abs(vy) < v_cap)
+    codes = np.full(len(xy), BALL_KEEP, dtype=np.uint8)
+    codes[fallen] = BALL_FALLEN
+    codes[caught] = BALL_CAUGHT
+    return codes
+
+
+class TestClassifyBalls(unittest.TestCase):
+    """Compara las implementaciones de la clasificación."""
+    
+    bounds = (280.0, 520.0, 20.0, 80.0, -100.0, 150.0)
+    
+    def _random_state(self, n: int, seed: int):
+        """Posiciones y velocidades que caen en los tres casos y en los bordes."""
+        rng = np.random.default_rng(seed)
+        xy = np.column_stack((rng.uniform(200, 600, n), rng.uniform(-150, 120, n)))
+        vy = rng.uniform(-300, 300, n)
+        # Valores exactamente en los límites de la zona y de la caída
+        xy[:4] = [(280.0, 20.0), (520.0, 80.0), (400.0, -100.0), (400.0, 50.0)]
+        vy[:4] = [0.0, -149.9, 0.0, 150.0]
+        return xy, vy
+    
+    def _run(self, kernel, xy, vy, n):
+        out = np.full(len(xy), 255, dtype=np.uint8)
+        kernel(xy, vy, n, *self.bounds, out)
+        return out
+    
+    def test_matches_reference(self):
+        for seed in range(20):
+            xy, vy = self._random_state(64, seed)
+            codes = self._run(_classify_balls, xy, vy, len(xy))
+            np.testing.assert_array_equal(codes, _reference_codes(xy, vy, *self.bounds))
+    
+    def test_compiled_matches_python(self):
+        # Con Numba, py_func es la función original sin compilar
+        py_func = getattr(_classify_balls, "py_func", _classify_balls)
+        for seed in range(20):
+            xy, vy = self._random_state(64, seed)
+            np.testing.assert_array_equal(self._run(_classify_balls, xy, vy, len(xy)),
+                                          self._run(py_func, xy, vy, len(xy)))
+    
+    def test_only_first_n_written(self):
+        xy, vy = self._random_state(10, 0)
+        codes = self._run(_classify_balls, xy, vy, 6)
+        self.assertTrue((codes[6:] == 255).all())
+
+
+class TestCheckCaughtBalls(unittest.TestCase):
+    """Retirada de bolas en PhysicsWorld.update."""
+    
+    def _world(self, states):
+        """Mundo sin gravedad con una bola por cada (x, y, vy) dado."""
+        world = PhysicsWorld(800, 600, seed=0,
+                             config=PhysicsConfig(gravity=0.0, max_balls=len(states)))
+        world.spawn_timer = -1e9  # sin generación durante la prueba
+        for x, y, vy in states:
+            body = world._bodies[world.spawn_ball()]
+            body.position = (x, y)
+            body.velocity = (0, vy)
+        return world
+    
+    def test_removes_fallen_and_caught(self):
+        world = self._world([
+            (400, 50, 0),      # capturada
+            (400, 50, 400),    # en la zona pero rápida
+            (100, -300, 0),    # caída
+            (600, 300, 0),     # en juego
+            (300, 30, -100),   # capturada
+        ])
+        world.update(1 / 120)
+        
+        self.assertEqual(world.balls_caught, 2)
+        xy, radii = world.get_balls()
+        self.assertEqual(len(xy), 2)
+        self.assertEqual(len(radii), 2)
+        # Quedan las dos bolas no retiradas, en su orden
+        self.assertAlmostEqual(xy[0, 0], 400, delta=1)
+        self.assertAlmostEqual(xy[1, 0], 600, delta=1)
+        # Cuerpos y formas retirados del espacio y devueltos al pool
+        self.assertEqual(len(world.space.bodies), 3)  # 2 bolas + plataforma
+        self.assertEqual(len(world._free_balls), 3)
+    
+    def test_matches_reference_many_balls(self):
+        rng = np.random.default_rng(1)
+        states = [(rng.uniform(200, 600), rng.uniform(-150, 120), rng.uniform(-300, 300))
+                  for _ in range(40)]
+        world = self._world(states)
+        world._sync_ball_arrays()
+        xy = world._ball_xy[:len(states)].copy()
+        vy = world._ball_vy[:len(states)].copy()
+        bounds = (world._bucket_x_min, world._bucket_x_max,
+                  world._bucket_y_min, world._bucket_y_max,
+                  world._fall_y, world._capture_max_vy)
+        expected = _reference_codes(xy, vy, *bounds)
+        
+        world._check_caught_balls()
+        
+        self.assertEqual(world.balls_caught, int((expected == BALL_CAUGHT).sum()))
+        np.testing.assert_array_equal(world.get_balls()[0], xy[expected == BALL_KEEP])
+    
+    def test_scalar_matches_compiled(self):
+        rng = np.random.default_rng(2)
+        for n in (1, 5, 16, 40):
+            states = [(rng.uniform(200, 600), rng.uniform(-150, 120), rng.uniform(-300, 300))
+                      for _ in range(n)]
+            world = self._world(states)
+            world._sync_ball_arrays()
+            removed, n_caught = world._classify_scalar(n)
+            expected, expected_caught = world._classify_compiled(n)
+            self.assertEqual(removed, expected.tolist())
+            self.assertEqual(n_caught, expected_caught)
+    
+    def test_path_follows_max_balls(self):
+        small = PhysicsWorld(800, 600, config=PhysicsConfig(max_balls=SCALAR_CLASSIFY_MAX_BALLS))
+        large = PhysicsWorld(800, 600, config=PhysicsConfig(max_balls=SCALAR_CLASSIFY_MAX_BALLS + 1))
+        self.assertEqual(small._classify, small._classify_scalar)
+        self.assertEqual(large._classify, large._classify_compiled)
+
+class TestDrivePlatform(unittest.TestCase):
+    """Movimiento de la plataforma hacia los objetivos de update_platform."""
+    
+    dt = 0.01
+    
+    def setUp(self):
+        self.world = PhysicsWorld(800, 600, seed=0, config=PhysicsConfig(gravity=0.0))
+        self.world.spawn_timer = -1e9
+        self.clock = mock.patch("physics_world.time.perf_counter")
+        self.perf_counter = self.clock.start()
+        self.addCleanup(self.clock.stop)
+    
+    def _target(self, t, position, angle):
+        self.perf_counter.return_value = t
+        self.world.update_platform(position, angle)
+    
+    def test_first_target_reached_in_one_step(self):
+        self._target(0.0, (300, 200), 0.3)
+        self.world.update(self.dt)
+        body = self.world.platform_body
+        self.assertAlmostEqual(body.position.x, 300)
+        self.assertAlmostEqual(body.position.y, 200)
+        self.assertAlmostEqual(body.angle, 0.3)
+    
+    def test_motion_spread_over_interval(self):
+        self._target(0.0, (400, 300), 0.0)
+        self.world.update(self.dt)
+        self._target(0.04, (440, 300), 0.0)
+        
+        xs = []
+        for _ in range(6):
+            self.world.update(self.dt)
+            xs.append(self.world.platform_body.position.x)
+        
+        # Cuatro pasos iguales de 10 px y después quieta, sin pasarse
+        np.testing.assert_allclose(xs, [410, 420, 430, 440, 440, 440])
+    
+    def test_interval_capped(self):
+        self._target(0.0, (400, 300), 0.0)
+        self.world.update(self.dt)
+        self._target(5.0, (500, 300), 0.0)
+        
+        steps = round(self.world.config.platform_max_interval / self.dt)
+        for _ in range(steps):
+            self.world.update(self.dt)
+        self.assertAlmostEqual(self.world.platform_body.position.x, 500)
+    
+    def test_angle_takes_short_way_round(self):
+        self._target(0.0, (400, 300), math.pi - 0.1)
+        self.world.update(self.dt)
+        self._target(0.02, (400, 300), -math.pi + 0.1)
+        
+        self.world.update(self.dt)
+        # Gira 0.2 rad en sentido positivo, no 2π - 0.2 en el contrario
+        self.assertAlmostEqual(self.world.platform_body.angular_velocity, 0.1 / self.dt)
+
+
+if __name__ == "__main__":
+    unittest.main()
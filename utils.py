@@ -5,9 +5,72 @@ Proporciona funciones para convertir coordenadas de MediaPipe a Pymunk
 y otras operaciones auxiliares.
 """
 
+import math
 import numpy as np
+from functools import lru_cache
 from typing import Tuple
 
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    # Numba es opcional: sin él, las funciones decoradas se ejecutan en Python
+    NUMBA_AVAILABLE = False
+    prange = range
+
+    def njit(*args, **kwargs):
+        """Sustituto de numba.njit que devuelve la función sin compilar."""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
+
+
+class CoordinateMapper:
+    """
+    Transformación afín de coordenadas de MediaPipe a Pymunk.
+    
+    Precalcula las escalas para un tamaño de fotograma y de mundo
+    dados, de modo que cada conversión es una multiplicación y una
+    resta. Acepta un punto suelto o un array (N, 2) de puntos.
+    """
+    
+    def __init__(self, frame_width: int, frame_height: int,
+                 physics_width: int, physics_height: int):
+        """
+        Inicializa la transformación.
+        
+        Args:
+            frame_width: Ancho del fotograma
+            frame_height: Alto del fotograma
+            physics_width: Ancho del mundo de física
+            physics_height: Alto del mundo de física
+        """
+        self.sx = physics_width / frame_width
+        self.sy = physics_height / frame_height
+        self.physics_height = physics_height
+    
+    def map_point(self, x: float, y: float) -> Tuple[float, float]:
+        """Convierte un punto (x, y) en píxeles de MediaPipe a Pymunk."""
+        # Invertir eje Y (MediaPipe: arriba=0, Pymunk: abajo=0)
+        return x * self.sx, self.physics_height - y * self.sy
+    
+    def __call__(self, points: np.ndarray) -> np.ndarray:
+        """
+        Convierte un array (N, 2) o (N, 3) de puntos en una sola pasada.
+        
+        Returns:
+            Array (N, 2) en coordenadas de Pymunk
+        """
+        return np.column_stack((points[:, 0] * self.sx,
+                                self.physics_height - points[:, 1] * self.sy))
+
+
+@lru_cache(maxsize=8)
+def get_coordinate_mapper(frame_width: int, frame_height: int,
+                          physics_width: int, physics_height: int) -> CoordinateMapper:
+    """Devuelve el CoordinateMapper de estas dimensiones (cacheado)."""
+    return CoordinateMapper(frame_width, frame_height, physics_width, physics_height)
+
 
 def mediapipe_to_pymunk(
     x: float, 
@@ -34,12 +97,9 @@ def mediapipe_to_pymunk(
     Returns:
         Tupla (x_pymunk, y_pymunk) en coordenadas de Pymunk
     """
-    # Escalar a las dimensiones del mundo de física
-    pymunk_x = (x / frame_width) * physics_width
-    # Invertir eje Y (MediaPipe: arriba=0, Pymunk: abajo=0)
-    pymunk_y = physics_height - (y / frame_height) * physics_height
-    
-    return pymunk_x, pymunk_y
+    mapper = get_coordinate_mapper(frame_width, frame_height,
+                                   physics_width, physics_height)
+    return mapper.map_point(x, y)
 
 
 def clamp(value: float, min_val: float, max_val: float) -> float:
@@ -59,7 +119,10 @@ def clamp(value: float, min_val: float, max_val: float) -> float:
 
 def normalize_angle(angle: float) -> float:
     """
-    Normaliza un ángulo al rango [-π, π].
+    Normaliza un ángulo al rango [-π, π).
+    
+    Forma cerrada con el módulo (sin bucles): funciona igual con
+    escalares y con arrays de NumPy.
     
     Args:
         angle: Ángulo en radianes
@@ -67,11 +130,7 @@ def normalize_angle(angle: float) -> float:
     Returns:
         Ángulo normalizado
     """
-    while angle > np.pi:
-        angle -= 2 * np.pi
-    while angle < -np.pi:
-        angle += 2 * np.pi
-    return angle
+    return (angle + np.pi) % (2 * np.pi) - np.pi
 
 
 def smooth_value(current: float, target: float, factor: float = 0.1) -> float:
@@ -100,7 +159,7 @@ def distance_2d(p1: Tuple[float, float], p2: Tuple[float, float]) -> float:
     Returns:
         Distancia euclidiana
     """
-    return np.sqrt((p1[0] - p2[0])**2 + (p1[1] - p2[1])**2)
+    return math.hypot(p1[0] - p2[0], p1[1] - p2[1])
 
 
 def get_hand_center(landmarks: np.ndarray) -> Tuple[float, float]:
@@ -113,9 +172,9 @@ def get_hand_center(landmarks: np.ndarray) -> Tuple[float, float]:
     Returns:
         Tupla (x, y) del centro de la mano
     """
-    center_x = np.mean(landmarks[:, 0])
-    center_y = np.mean(landmarks[:, 1])
-    return center_x, center_y
+    # Una sola reducción sobre las dos columnas
+    center = landmarks[:, :2].mean(axis=0)
+    return float(center[0]), float(center[1])
 
 
 def angle_difference(angle1: float, angle2: float) -> float:
@@ -127,11 +186,6 @@ def angle_difference(angle1: float, angle2: float) -> float:
         angle2: Segundo ángulo en radianes
         
     Returns:
-        Diferencia de ángulo en radianes
-    """
-    diff = angle1 - angle2
-    while diff > np.pi:
-        diff -= 2 * np.pi
-    while diff < -np.pi:
-        diff += 2 * np.pi
-    return diff
+        Diferencia de ángulo en radianes, en [-π, π)
+    """
+    return normalize_angle(angle1 - angle2)